@@ -119,7 +119,9 @@ class CodeStructFormatter:
 
 	def _remove_trailing_whitespace(self, content: str) -> str:
 		"""Remove trailing whitespace from lines."""
-		return re.sub(r"[ \t]+$", "", content, flags=re.MULTILINE)
+		if " \n" not in content and "\t\n" not in content and not content.endswith((" ", "\t")):
+			return content
+		return "\n".join(line.rstrip(" \t") for line in content.split("\n"))
 
 	def _normalize_indentation(self, content: str) -> str:
 		"""Convert tabs to spaces and normalize indentation levels."""
@@ -1,17 +1,30 @@
 """CodeStruct Linter for checking CodeStruct notation files."""
 
 import re
+from collections.abc import Callable
+from itertools import chain
 from pathlib import Path
+from typing import ClassVar
 
 from lark import Token, Tree
 from lark.exceptions import UnexpectedToken
 
 from .parser import CodeStructParser, ParseError
 
+# Naming conventions: hash IDs start with a letter (CS301), attribute keys with a lowercase letter (CS401)
+HASH_ID_NAME_RE = re.compile(r"^[A-Za-z][A-Za-z0-9_]*$")
+ATTRIBUTE_KEY_NAME_RE = re.compile(r"^[a-z][a-zA-Z0-9_]*$")
+
+# Entity types that must carry a doc field (CS201)
+DOCUMENTABLE_ENTITY_TYPES = frozenset(("module", "class", "func"))
+
 
 class LintMessage:
 	"""A message produced by the linter."""
 
+	# Lint runs can produce many messages, so skip the per-instance __dict__
+	__slots__ = ("code", "col", "file_path", "line", "message")
+
 	def __init__(self, file_path: str, line: int, col: int, code: str, message: str) -> None:
 		"""Initialize a lint message."""
 		self.file_path = file_path
@@ -51,25 +64,25 @@ class CodeStructLinter:
 			cls._instance = cls()
 		return cls._instance
 
-	def lint_file(self, file_path: str) -> list[LintMessage]:
+	def lint_file(self, file_path: str, *, opener: Callable[[], str] | None = None) -> list[LintMessage]:
 		"""Lint a CodeStruct file.
 
 		Args:
 			file_path: Path to the file to lint
+			opener: Optional callable returning the file content, used instead of reading file_path
 
 		Returns:
 			List of lint messages
 		"""
 		try:
-			path = Path(file_path)
-			content = path.read_text()
+			content = opener() if opener is not None else Path(file_path).read_text()
 			tree = self.parser.parse_string(content)
 			return self.lint_tree(tree, file_path)
 		except ParseError as e:
 			# Handle parse error as a lint error
 			line, col = 1, 0
 			# Try to get line/col from underlying exception if available
-			if hasattr(e, "__cause__") and isinstance(e.__cause__, UnexpectedToken):
+			if isinstance(e.__cause__, UnexpectedToken):
 				line = getattr(e.__cause__, "line", 1)
 				col = getattr(e.__cause__, "column", 0)
 			return [LintMessage(file_path, line, col, "CS001", f"Parse error: {e!s}")]
@@ -85,6 +98,9 @@ class CodeStructLinter:
 	def lint_tree(self, tree: Tree, file_path: str) -> list[LintMessage]:
 		"""Lint a parsed CodeStruct tree.
 
+		Every rule in self.rules with a known per-node check is applied in a single walk over the tree;
+		any other rule is called on the whole tree. Messages are still grouped by rule, in rule order.
+
 		Args:
 			tree: Parsed Lark tree
 			file_path: Source file path for messages
@@ -92,10 +108,23 @@ class CodeStructLinter:
 		Returns:
 			List of lint messages
 		"""
-		messages = []
+		messages_by_rule: list[list[LintMessage]] = []
+		checks_by_node: dict[str, list[tuple[Callable, list[LintMessage]]]] = {}
 		for rule in self.rules:
-			messages.extend(rule(tree, file_path))
-		return messages
+			node_check = self._RULE_NODE_CHECKS.get(getattr(rule, "__func__", None))
+			if node_check is None:
+				messages_by_rule.append(rule(tree, file_path))
+				continue
+			messages: list[LintMessage] = []
+			messages_by_rule.append(messages)
+			node_data, check = node_check
+			checks_by_node.setdefault(node_data, []).append((check, messages))
+
+		if checks_by_node:
+			for node in tree.iter_subtrees():
+				for check, messages in checks_by_node.get(node.data, ()):
+					check(node, file_path, messages)
+		return list(chain.from_iterable(messages_by_rule))
 
 	def check_short_names(self, tree: Tree, file_path: str) -> list[LintMessage]:
 		"""Check for overly short entity names.
@@ -108,21 +137,8 @@ class CodeStructLinter:
 			List of lint messages
 		"""
 		messages = []
-
 		for entity_node in tree.find_data("entity_name"):
-			if entity_node.children and isinstance(entity_node.children[0], Token):
-				token = entity_node.children[0]
-				name = token.value.strip()
-				if len(name) == 1:
-					messages.append(
-						LintMessage(
-							file_path,
-							getattr(token, "line", 1),
-							getattr(token, "column", 0),
-							"CS101",
-							f"Entity name '{name}' is too short",
-						)
-					)
+			self._check_entity_name(entity_node, file_path, messages)
 		return messages
 
 	def check_missing_doc(self, tree: Tree, file_path: str) -> list[LintMessage]:
@@ -136,54 +152,8 @@ class CodeStructLinter:
 			List of lint messages
 		"""
 		messages = []
-
-		# Find entities (module, class, func) that don't have a doc_field
 		for entity in tree.find_data("entity"):
-			entity_type: str | None = None
-			entity_name: str | None = None
-			entity_line = 1
-			entity_col = 0
-
-			# Get entity type and name
-			for child in entity.children:
-				if isinstance(child, Tree) and child.data == "entity_line":
-					# Get position from the entity_line for error reporting
-					if hasattr(child, "meta"):
-						entity_line = getattr(child.meta, "line", 1)
-						entity_col = getattr(child.meta, "column", 0)
-
-					# Process children to find type and name
-					for i, subchild in enumerate(child.children):
-						if i == 0 and isinstance(subchild, Token):  # First child is the keyword
-							entity_type = subchild.value.rstrip(":")
-						elif i == 1 and isinstance(subchild, Token):  # Second child is the name
-							entity_name = subchild.value.strip()
-
-			# Skip entities that aren't module/class/func
-			if not entity_type or entity_type not in ["module", "class", "func"]:
-				continue
-
-			# Check if this entity has a doc_field
-			has_doc = False
-			for child in entity.children:
-				if isinstance(child, Tree) and child.data == "child_block":
-					for subchild in child.children:
-						if isinstance(subchild, Tree) and subchild.data == "doc_field":
-							has_doc = True
-							break
-
-			if not has_doc and entity_name:
-				entity_type_str = entity_type.capitalize() if entity_type else "Entity"
-				messages.append(
-					LintMessage(
-						file_path,
-						entity_line,
-						entity_col,
-						"CS201",
-						f"{entity_type_str} '{entity_name}' is missing documentation",
-					)
-				)
-
+			self._check_entity_doc(entity, file_path, messages)
 		return messages
 
 	def check_hash_format(self, tree: Tree, file_path: str) -> list[LintMessage]:
@@ -197,21 +167,8 @@ class CodeStructLinter:
 			List of lint messages
 		"""
 		messages = []
-
 		for hash_node in tree.find_data("hash_id"):
-			for child in hash_node.children:
-				if isinstance(child, Token) and child.type == "_HASH_VALUE_TERMINAL":
-					hash_value = child.value
-					if not re.match(r"^[A-Za-z][A-Za-z0-9_]*$", hash_value):
-						messages.append(
-							LintMessage(
-								file_path,
-								getattr(child, "line", 1),
-								getattr(child, "column", 0),
-								"CS301",
-								f"Hash ID '{hash_value}' does not follow naming convention",
-							)
-						)
+			self._check_hash_id(hash_node, file_path, messages)
 		return messages
 
 	def check_attribute_naming(self, tree: Tree, file_path: str) -> list[LintMessage]:
@@ -225,31 +182,120 @@ class CodeStructLinter:
 			List of lint messages
 		"""
 		messages = []
-
 		for attr in tree.find_data("attribute"):
-			attr_key = None
-			attr_line = getattr(attr, "line", 1) if hasattr(attr, "line") else 1
-			attr_col = getattr(attr, "column", 0) if hasattr(attr, "column") else 0
-
-			# Try to get better position information from metadata if available
-			if hasattr(attr, "meta"):
-				attr_line = getattr(attr.meta, "line", attr_line)
-				attr_col = getattr(attr.meta, "column", attr_col)
-
-			for child in attr.children:
-				if isinstance(child, Token) and child.type == "ATTR_KEY":
-					attr_key = child.value
-					attr_line = getattr(child, "line", attr_line)
-					attr_col = getattr(child, "column", attr_col)
-
-			if attr_key and not re.match(r"^[a-z][a-zA-Z0-9_]*$", attr_key):
+			self._check_attribute(attr, file_path, messages)
+		return messages
+
+	@staticmethod
+	def _check_entity_name(entity_node: Tree, file_path: str, messages: list[LintMessage]) -> None:
+		"""Report an entity_name node whose name is a single character (CS101)."""
+		if entity_node.children and isinstance(entity_node.children[0], Token):
+			token = entity_node.children[0]
+			name = token.value.strip()
+			if len(name) == 1:
 				messages.append(
 					LintMessage(
 						file_path,
-						attr_line,
-						attr_col,
-						"CS401",
-						f"Attribute key '{attr_key}' should be camelCase or snake_case starting with lowercase",
+						getattr(token, "line", 1),
+						getattr(token, "column", 0),
+						"CS101",
+						f"Entity name '{name}' is too short",
 					)
 				)
-		return messages
+
+	@staticmethod
+	def _check_entity_doc(entity: Tree, file_path: str, messages: list[LintMessage]) -> None:
+		"""Report a module, class, or func entity node without a doc field (CS201)."""
+		entity_type: str | None = None
+		entity_name: str | None = None
+		entity_line = 1
+		entity_col = 0
+
+		# Get entity type and name
+		for child in entity.children:
+			if isinstance(child, Tree) and child.data == "entity_line":
+				# Get position from the entity_line for error reporting
+				entity_line = getattr(child.meta, "line", 1)
+				entity_col = getattr(child.meta, "column", 0)
+
+				# The first child is the keyword and the second the name
+				line_children = child.children
+				if line_children and isinstance(line_children[0], Token):
+					entity_type = line_children[0].value.rstrip(":")
+				if len(line_children) > 1 and isinstance(line_children[1], Token):
+					entity_name = line_children[1].value.strip()
+
+		# Skip entities that aren't module/class/func
+		if entity_type not in DOCUMENTABLE_ENTITY_TYPES:
+			return
+
+		# Check if this entity has a doc_field
+		has_doc = False
+		for child in entity.children:
+			if isinstance(child, Tree) and child.data == "child_block":
+				for subchild in child.children:
+					if isinstance(subchild, Tree) and subchild.data == "doc_field":
+						has_doc = True
+						break
+
+		if not has_doc and entity_name:
+			entity_type_str = entity_type.capitalize() if entity_type else "Entity"
+			messages.append(
+				LintMessage(
+					file_path,
+					entity_line,
+					entity_col,
+					"CS201",
+					f"{entity_type_str} '{entity_name}' is missing documentation",
+				)
+			)
+
+	@staticmethod
+	def _check_hash_id(hash_node: Tree, file_path: str, messages: list[LintMessage]) -> None:
+		"""Report a hash_id node whose value breaks the naming convention (CS301)."""
+		for child in hash_node.children:
+			if isinstance(child, Token) and child.type == "_HASH_VALUE_TERMINAL":
+				hash_value = child.value
+				if not HASH_ID_NAME_RE.match(hash_value):
+					messages.append(
+						LintMessage(
+							file_path,
+							getattr(child, "line", 1),
+							getattr(child, "column", 0),
+							"CS301",
+							f"Hash ID '{hash_value}' does not follow naming convention",
+						)
+					)
+
+	@staticmethod
+	def _check_attribute(attr: Tree, file_path: str, messages: list[LintMessage]) -> None:
+		"""Report an attribute node whose key is not camelCase or snake_case (CS401)."""
+		attr_key = None
+		# Position from the tree metadata, if positions were propagated
+		attr_line = getattr(attr.meta, "line", 1)
+		attr_col = getattr(attr.meta, "column", 0)
+
+		for child in attr.children:
+			if isinstance(child, Token) and child.type == "ATTR_KEY":
+				attr_key = child.value
+				attr_line = getattr(child, "line", attr_line)
+				attr_col = getattr(child, "column", attr_col)
+
+		if attr_key and not ATTRIBUTE_KEY_NAME_RE.match(attr_key):
+			messages.append(
+				LintMessage(
+					file_path,
+					attr_line,
+					attr_col,
+					"CS401",
+					f"Attribute key '{attr_key}' should be camelCase or snake_case starting with lowercase",
+				)
+			)
+
+	# Per-node check behind each built-in rule, with the tree node it inspects, so lint_tree can run them in one walk
+	_RULE_NODE_CHECKS: ClassVar[dict[Callable, tuple[str, Callable]]] = {
+		check_short_names: ("entity_name", _check_entity_name),
+		check_missing_doc: ("entity", _check_entity_doc),
+		check_hash_format: ("hash_id", _check_hash_id),
+		check_attribute_naming: ("attribute", _check_attribute),
+	}
@@ -6,6 +6,15 @@ from pygls.server import LanguageServer
 from codestruct.linter import CodeStructLinter
 from codestruct.parser import CodeStructParser, ParseError
 
+# LSP severity per lint code prefix; codes without a matching prefix are informational
+DIAGNOSTIC_SEVERITIES = {
+	"CS00": lsp.DiagnosticSeverity.Error,  # File/parse errors
+	"CS1": lsp.DiagnosticSeverity.Warning,  # Naming issues
+	"CS2": lsp.DiagnosticSeverity.Information,  # Documentation issues
+	"CS3": lsp.DiagnosticSeverity.Warning,  # Hash format issues
+	"CS4": lsp.DiagnosticSeverity.Warning,  # Attribute naming issues
+}
+
 
 def get_diagnostics(
 	server: LanguageServer, params: lsp.DocumentDiagnosticParams
@@ -33,7 +42,7 @@ def get_diagnostics(
 					end=lsp.Position(line=max(0, msg.line - 1), character=max(0, msg.col + 10)),
 				),
 				message=msg.message,
-				severity=_get_diagnostic_severity(msg.code),
+				severity=get_diagnostic_severity(msg.code),
 				code=msg.code,
 				source="codestruct",
 			)
@@ -56,14 +65,8 @@ def get_diagnostics(
 	return lsp.RelatedFullDocumentDiagnosticReport(kind="full", items=diagnostics)
 
 
-def _get_diagnostic_severity(code: str) -> lsp.DiagnosticSeverity:
+def get_diagnostic_severity(code: str) -> lsp.DiagnosticSeverity:
 	"""Map error codes to LSP diagnostic severity."""
-	if code.startswith("CS00"):  # File/parse errors
-		return lsp.DiagnosticSeverity.Error
-	if code.startswith("CS1"):  # Naming issues
-		return lsp.DiagnosticSeverity.Warning
-	if code.startswith("CS2"):  # Documentation issues
-		return lsp.DiagnosticSeverity.Information
-	if code.startswith(("CS3", "CS4")):  # Hash format issues
-		return lsp.DiagnosticSeverity.Warning
-	return lsp.DiagnosticSeverity.Information
+	# File/parse errors are keyed by their 4-character prefix, the rule categories by 3
+	severity = DIAGNOSTIC_SEVERITIES.get(code[:4]) or DIAGNOSTIC_SEVERITIES.get(code[:3])
+	return severity or lsp.DiagnosticSeverity.Information
@@ -4,7 +4,6 @@ from lsprotocol import types as lsp
 from pygls.server import LanguageServer
 
 from codestruct.parser import CodeStructParser, ParseError
-from codestruct.transformer import CodeStructTransformer
 
 # Constants
 MAX_DOC_LENGTH = 50
@@ -18,10 +17,7 @@ def get_document_symbols(server: LanguageServer, params: lsp.DocumentSymbolParam
 
 	try:
 		parser = CodeStructParser.get_instance()
-		transformer = CodeStructTransformer.get_instance()
-
-		tree = parser.parse_string(document.source)
-		transformed = transformer.start(tree.children)
+		transformed = parser.transform_string(document.source)
 
 		return _convert_to_document_symbols(transformed, document.lines)
 
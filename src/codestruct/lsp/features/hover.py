@@ -6,7 +6,7 @@ from lsprotocol import types as lsp
 from pygls.server import LanguageServer
 
 from codestruct.parser import CodeStructParser, ParseError
-from codestruct.transformer import CodeStructTransformer
+from codestruct.transformer import flatten_structure
 
 
 def get_hover(server: LanguageServer, params: lsp.HoverParams) -> lsp.Hover | None:
@@ -207,14 +207,11 @@ def _find_entity_definition(name: str, content: str) -> dict | None:
 	"""Find the definition of an entity by name."""
 	try:
 		parser = CodeStructParser.get_instance()
-		transformer = CodeStructTransformer.get_instance()
-
-		tree = parser.parse_string(content)
-		transformed = transformer.start(tree.children)
+		transformed = parser.transform_string(content)
 
 		# Search for entity with matching name
-		for entity in _flatten_entities(transformed):
-			if isinstance(entity, dict) and entity.get("name") == name:
+		for entity in flatten_structure(transformed).nodes:
+			if entity.get("name") == name:
 				return entity
 
 	except ParseError:
@@ -223,17 +220,6 @@ def _find_entity_definition(name: str, content: str) -> dict | None:
 	return None
 
 
-def _flatten_entities(entities: list) -> list:
-	"""Flatten nested entity structure for searching."""
-	result = []
-	for entity in entities:
-		if isinstance(entity, dict):
-			result.append(entity)
-			if "children" in entity:
-				result.extend(_flatten_entities(entity["children"]))
-	return result
-
-
 def _format_entity_hover(entity: dict) -> str:
 	"""Format entity information for hover display."""
 	entity_type = entity.get("type", "entity")
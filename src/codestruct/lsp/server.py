@@ -2,6 +2,7 @@
 
 import asyncio
 import logging
+from functools import cached_property
 from pathlib import Path
 from typing import Any
 
@@ -32,18 +33,33 @@ class CodeStructLanguageServer(LanguageServer):
 		"""Initialize the CodeStruct Language Server."""
 		super().__init__(name, version)
 
-		# Initialize CodeStruct components
-		self.parser = CodeStructParser.get_instance()
-		self.linter = CodeStructLinter.get_instance()
-		self.formatter = CodeStructFormatter.get_instance()
-		self.transformer = CodeStructTransformer.get_instance()
-
 		# Cache for parsed documents
 		self._document_cache: dict[str, Any] = {}
 
 		# Track background tasks
 		self._background_tasks: set[asyncio.Task] = set()
 
+	# CodeStruct components are resolved on first use, so creating a server doesn't build them all
+	@cached_property
+	def parser(self) -> CodeStructParser:
+		"""The shared CodeStruct parser."""
+		return CodeStructParser.get_instance()
+
+	@cached_property
+	def linter(self) -> CodeStructLinter:
+		"""The shared CodeStruct linter."""
+		return CodeStructLinter.get_instance()
+
+	@cached_property
+	def formatter(self) -> CodeStructFormatter:
+		"""The shared CodeStruct formatter."""
+		return CodeStructFormatter.get_instance()
+
+	@cached_property
+	def transformer(self) -> CodeStructTransformer:
+		"""The shared CodeStruct transformer."""
+		return CodeStructTransformer.get_instance()
+
 	def setup_features(self) -> None:
 		"""Setup all LSP features."""
 
@@ -221,15 +237,7 @@ class CodeStructLanguageServer(LanguageServer):
 
 	def _get_diagnostic_severity(self, code: str) -> lsp.DiagnosticSeverity:
 		"""Map error codes to LSP diagnostic severity."""
-		if code.startswith("CS00"):  # File/parse errors
-			return lsp.DiagnosticSeverity.Error
-		if code.startswith("CS1"):  # Naming issues
-			return lsp.DiagnosticSeverity.Warning
-		if code.startswith("CS2"):  # Documentation issues
-			return lsp.DiagnosticSeverity.Information
-		if code.startswith(("CS3", "CS4")):  # Hash format issues
-			return lsp.DiagnosticSeverity.Warning
-		return lsp.DiagnosticSeverity.Information
+		return diagnostics.get_diagnostic_severity(code)
 
 	def get_cached_document(self, uri: str) -> dict[str, Any] | None:
 		"""Get cached document data."""
@@ -1,9 +1,54 @@
 """CodeStruct minifier for LLM context compression."""
 
+import functools
 import re
+import sys
 from pathlib import Path
 
-from .parser import CodeStructParser, ParseError
+from .parser import ParseError
+
+# Maximum number of distinct entity lines memoized per minifier
+ENTITY_LINE_CACHE_SIZE = 4096
+
+# Maximum number of whole documents memoized per minifier (kept small since documents can be large)
+MINIFY_CACHE_SIZE = 128
+
+# Hash IDs (" ::: abc123") are dropped from minified output
+HASH_ID_RE = re.compile(r"\s*:::\s*[A-Za-z0-9_]+")
+
+# A quoted value (a quote preceded by a backslash neither opens nor closes one, and an unterminated
+# quote runs to the end), or one of the separators the attribute scanners split on
+QUOTED_OR_SEPARATOR_RE = re.compile(
+	r"""(?<!\\)(?:"(?:[^"\\]+|\\+.?)*"?|'(?:[^'\\]+|\\+.?)*'?)|[,\[\]]""",
+	re.DOTALL,
+)
+
+# Entity keywords as "keyword:" prefixes, so a line can be matched with a single startswith call
+ENTITY_KEYWORD_PREFIXES = (
+	"module:",
+	"class:",
+	"func:",
+	"param:",
+	"returns:",
+	"var:",
+	"const:",
+	"type_alias:",
+	"union:",
+	"optional:",
+	"import:",
+	"dir:",
+	"file:",
+	"namespace:",
+	"lambda:",
+	"attr:",
+)
+
+
+def _unquote(value: str) -> str:
+	"""Remove matching single or double quotes surrounding a value."""
+	if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":  # noqa: PLR2004
+		return value[1:-1]
+	return value
 
 
 class CodeStructMinifier:
@@ -18,7 +63,6 @@ class CodeStructMinifier:
 			include_legend: Whether to include the legend/mapping for LLMs
 		"""
 		self.include_legend = include_legend
-		self.parser = CodeStructParser()
 
 		# Keyword shortening mappings
 		self.keyword_map = {
@@ -70,6 +114,17 @@ class CodeStructMinifier:
 			"false": "F",
 		}
 
+		# The caches below wrap bound methods, so each one references this instance and forms a reference cycle.
+		# That is intentional: the results depend on this instance's shortening tables, so the caches must live
+		# and die with it (the cycle collector frees both together), and the shared get_instance() minifier
+		# lives for the whole process anyway. A module-level cache would instead keep every minifier alive.
+
+		# Repetitive entity lines (e.g. "param: x [type: STRING]") are common, so memoize them
+		self._split_entity_line_cached = functools.lru_cache(maxsize=ENTITY_LINE_CACHE_SIZE)(self._split_entity_line)
+		# The same document is often minified repeatedly (e.g. on every save), so memoize whole results;
+		# the legend setting is part of the key so toggling include_legend stays correct
+		self._minify_string_cached = functools.lru_cache(maxsize=MINIFY_CACHE_SIZE)(self._minify_string)
+
 	@classmethod
 	def get_instance(cls) -> "CodeStructMinifier":
 		"""Get a singleton instance of the minifier to avoid unnecessary initialization.
@@ -95,8 +150,12 @@ class CodeStructMinifier:
 			ParseError: If the file cannot be parsed
 		"""
 		try:
-			path = Path(file_path)
-			content = path.read_text(encoding="utf-8")
+			raw = Path(file_path).read_bytes()
+			# CodeStruct is mostly ASCII, which has a much faster decoder than UTF-8
+			content = raw.decode("ascii") if raw.isascii() else raw.decode("utf-8")
+			# Keep the universal-newline behaviour of text mode
+			if "\r" in content:
+				content = content.replace("\r\n", "\n").replace("\r", "\n")
 			return self.minify_string(content)
 		except FileNotFoundError:
 			msg = f"File not found: {file_path}"
@@ -114,6 +173,10 @@ class CodeStructMinifier:
 		Returns:
 			Minified CodeStruct string
 		"""
+		return self._minify_string_cached(content, self.include_legend)
+
+	def _minify_string(self, content: str, include_legend: bool) -> str:
+		"""Minify content; a pure function of its arguments, so results can be memoized."""
 		if not content.strip():
 			return ""
 
@@ -121,28 +184,30 @@ class CodeStructMinifier:
 		# and apply basic minification without complex AST parsing
 		result = self._minify_text_directly(content)
 
-		if self.include_legend:
+		if include_legend:
 			legend = self._generate_legend()
 			return f"{legend}\n{result}"
 		return result
 
 	def _minify_text_directly(self, content: str) -> str:
 		"""Minify content by parsing text line by line and applying transformations."""
-		lines = content.split("\n")
 		entities = []
 		current_entity = None
 		children_stack = []
 		indent_stack = [0]  # Track indentation levels
 		skip_impl_block = False
 		impl_indent_level = 0
+		# Bind hot-loop lookups to locals once instead of resolving them on every line
+		parse_entity_line = self._parse_entity_line
+		shorten_attr_key = self._shorten_attr_key
+		type_map = self.type_map
+
+		# Drop empty lines and comments in one comprehension pass, keeping each stripped line
+		meaningful_lines = [
+			(line, stripped) for line in content.split("\n") if (stripped := line.strip()) and stripped[0] != "#"
+		]
 
-		for _line_num, line in enumerate(lines):
-			stripped = line.strip()
-
-			# Skip empty lines and comments
-			if not stripped or stripped.startswith("#"):
-				continue
-
+		for line, stripped in meaningful_lines:
 			# Calculate current indentation
 			current_indent = len(line) - len(line.lstrip())
 
@@ -176,7 +241,7 @@ class CodeStructMinifier:
 					if children_stack:
 						parent_entity = children_stack.pop()
 						if current_entity:
-							if "children" not in parent_entity:
+							if parent_entity["children"] is None:
 								parent_entity["children"] = []
 							parent_entity["children"].append(current_entity)
 						current_entity = parent_entity
@@ -184,27 +249,7 @@ class CodeStructMinifier:
 			# Check if this is a standalone attribute line or attribute block
 			if current_indent > 0 and children_stack and ":" in stripped:
 				# Check if this is an entity keyword or a standalone attribute
-				is_entity = any(
-					stripped.startswith(kw + ":")
-					for kw in [
-						"module",
-						"class",
-						"func",
-						"param",
-						"returns",
-						"var",
-						"const",
-						"type_alias",
-						"union",
-						"optional",
-						"import",
-						"dir",
-						"file",
-						"namespace",
-						"lambda",
-						"attr",
-					]
-				)
+				is_entity = stripped.startswith(ENTITY_KEYWORD_PREFIXES)
 
 				# Check if this is a standalone attribute block like "[type: FLOAT, default: 3.14159]"
 				is_attr_block = stripped.startswith("[") and stripped.endswith("]")
@@ -224,36 +269,28 @@ class CodeStructMinifier:
 						key = key.strip()
 						value = value.strip()
 
-						# Remove quotes from value
-						if (value.startswith('"') and value.endswith('"')) or (
-							value.startswith("'") and value.endswith("'")
-						):
-							value = value[1:-1]
-
 						# Apply transformations
-						short_key = self._shorten_attr_key(key)
-						short_value = self.type_map.get(value, value)
+						short_key = shorten_attr_key(key)
+						value = _unquote(value)
+						short_value = type_map.get(value, value)
 						parent_entity["attributes"][short_key] = short_value
 					continue
 
 			# Parse the entity line
-			entity_data = self._parse_entity_line(stripped)
+			entity_data = parse_entity_line(stripped)
 			if entity_data:
 				# If we have a current entity, we need to place it appropriately
-				if current_entity:
-					if current_indent == indent_stack[-1]:
-						# Same level - add previous entity as sibling
-						if children_stack:
-							parent = children_stack[-1]
-							if "children" not in parent:
-								parent["children"] = []
-							parent["children"].append(current_entity)
-						else:
-							# Top level entity
-							entities.append(current_entity)
-					elif current_indent > indent_stack[-1]:
-						# This shouldn't happen as we handle indentation above
-						pass
+				# (deeper indentation was already handled above)
+				if current_entity and current_indent == indent_stack[-1]:
+					# Same level - add previous entity as sibling
+					if children_stack:
+						parent = children_stack[-1]
+						if parent["children"] is None:
+							parent["children"] = []
+						parent["children"].append(current_entity)
+					else:
+						# Top level entity
+						entities.append(current_entity)
 
 				current_entity = entity_data
 
@@ -263,7 +300,7 @@ class CodeStructMinifier:
 			while children_stack:
 				parent_entity = children_stack.pop()
 				if current_entity:
-					if "children" not in parent_entity:
+					if parent_entity["children"] is None:
 						parent_entity["children"] = []
 					parent_entity["children"].append(current_entity)
 				current_entity = parent_entity
@@ -279,39 +316,20 @@ class CodeStructMinifier:
 
 	def _parse_entity_line(self, line: str) -> dict | None:
 		"""Parse a single entity line into structured data."""
+		parts = self._split_entity_line_cached(line)
+		if parts is None:
+			return None
+
+		keyword, name, attributes = parts
+		# Build a fresh attribute dict since entities are mutated while building the hierarchy;
+		# children stay None until the first child is attached, as most entities are leaves
+		return {"keyword": keyword, "name": name, "attributes": dict(attributes), "children": None}
+
+	def _split_entity_line(self, line: str) -> tuple[str, str, tuple[tuple[str, str], ...]] | None:
+		"""Split an entity line into its shortened keyword, name, and attribute pairs."""
 		# Remove hash IDs (anything after :::)
-		line = re.sub(r"\s*:::\s*[A-Za-z0-9_]+", "", line)
+		line = HASH_ID_RE.sub("", line)
 
-		# Handle grouped entities (with &)
-		if " & " in line:
-			# Split on first colon to get keyword
-			colon_idx = line.find(":")
-			if colon_idx == -1:
-				return None
-
-			keyword = line[:colon_idx].strip()
-			rest = line[colon_idx + 1 :].strip()
-
-			# Find attributes by looking for balanced brackets
-			attr_match = self._find_attribute_section(rest)
-			attributes = {}
-			if attr_match:
-				attributes = self._parse_attributes(attr_match)
-				# Remove the attribute section from rest
-				attr_start = rest.find("[")
-				rest = rest[:attr_start].strip()
-
-			# Split grouped entities
-			names = [name.strip() for name in rest.split("&")]
-			grouped_names = "&".join(names)
-
-			return {
-				"keyword": self._shorten_keyword(keyword),
-				"name": grouped_names,
-				"attributes": attributes,
-				"children": [],
-			}
-		# Regular entity
 		# Parse: keyword: name [attributes]
 		colon_idx = line.find(":")
 		if colon_idx == -1:
@@ -329,9 +347,10 @@ class CodeStructMinifier:
 			attr_start = rest.find("[")
 			rest = rest[:attr_start].strip()
 
-		name = rest.strip()
+		# Handle grouped entities (with &)
+		name = "&".join(part.strip() for part in rest.split("&")) if " & " in line else rest.strip()
 
-		return {"keyword": self._shorten_keyword(keyword), "name": name, "attributes": attributes, "children": []}
+		return self._shorten_keyword(keyword), name, tuple(attributes.items())
 
 	def _find_attribute_section(self, text: str) -> str | None:
 		"""Find and extract the attribute section [key:value, key:value] handling nested brackets in quotes."""
@@ -339,25 +358,22 @@ class CodeStructMinifier:
 		if start_idx == -1:
 			return None
 
+		# Fast path: without quotes or nested brackets the section ends at the first "]"
+		if '"' not in text and "'" not in text:
+			end_idx = text.find("]", start_idx)
+			if end_idx != -1 and text.find("[", start_idx + 1, end_idx) == -1:
+				return text[start_idx + 1 : end_idx]
+
+		# Let the regex skip over quoted values so only brackets are visited in Python
 		bracket_count = 0
-		in_quotes = False
-		quote_char = None
-
-		for i, char in enumerate(text[start_idx:], start_idx):
-			if char in ('"', "'") and (i == start_idx or text[i - 1] != "\\"):
-				if not in_quotes:
-					in_quotes = True
-					quote_char = char
-				elif char == quote_char:
-					in_quotes = False
-					quote_char = None
-			elif not in_quotes:
-				if char == "[":
-					bracket_count += 1
-				elif char == "]":
-					bracket_count -= 1
-					if bracket_count == 0:
-						return text[start_idx + 1 : i]
+		for match in QUOTED_OR_SEPARATOR_RE.finditer(text, start_idx):
+			char = match.group()
+			if char == "[":
+				bracket_count += 1
+			elif char == "]":
+				bracket_count -= 1
+				if bracket_count == 0:
+					return text[start_idx + 1 : match.start()]
 
 		return None
 
@@ -365,28 +381,11 @@ class CodeStructMinifier:
 		"""Parse attribute string into key-value pairs."""
 		attributes = {}
 
-		# Split by comma but respect quoted values
-		attr_parts = []
-		current = ""
-		in_quotes = False
-		quote_char = None
-
-		for char in attr_str:
-			if char in ('"', "'") and (not current or current[-1] != "\\"):
-				if not in_quotes:
-					in_quotes = True
-					quote_char = char
-				elif char == quote_char:
-					in_quotes = False
-					quote_char = None
-			elif char == "," and not in_quotes:
-				attr_parts.append(current.strip())
-				current = ""
-				continue
-			current += char
-
-		if current.strip():
-			attr_parts.append(current.strip())
+		if '"' not in attr_str and "'" not in attr_str:
+			# Fast path: nothing to respect, so a plain split is equivalent to the scan
+			attr_parts = attr_str.split(",")
+		else:
+			attr_parts = self._split_attribute_parts(attr_str)
 
 		# Parse each key:value pair
 		for part in attr_parts:
@@ -395,40 +394,77 @@ class CodeStructMinifier:
 				key = key.strip()
 				value = value.strip()
 
-				# Remove quotes from value
-				if (value.startswith('"') and value.endswith('"')) or (value.startswith("'") and value.endswith("'")):
-					value = value[1:-1]
-
 				# Apply transformations
 				short_key = self._shorten_attr_key(key)
+				value = _unquote(value)
 				short_value = self.type_map.get(value, value)
 				attributes[short_key] = short_value
 
 		return attributes
 
+	def _split_attribute_parts(self, attr_str: str) -> list[str]:
+		"""Split attribute string by comma but respect quoted values."""
+		attr_parts = []
+		part_start = 0
+		# Quoted values are matched whole, so any "," match is a separator outside quotes
+		for match in QUOTED_OR_SEPARATOR_RE.finditer(attr_str):
+			if match.group() == ",":
+				attr_parts.append(attr_str[part_start : match.start()].strip())
+				part_start = match.end()
+
+		last_part = attr_str[part_start:].strip()
+		if last_part:
+			attr_parts.append(last_part)
+
+		return attr_parts
+
 	def _entity_to_minified(self, entity: dict) -> str:
-		"""Convert entity dict to minified string format."""
-		result = f"{entity['keyword']}:{entity['name']}"
+		"""Convert entity dict to minified string format.
 
-		# Add attributes
-		if entity["attributes"]:
-			attr_strs = [f"{k}:{v}" for k, v in entity["attributes"].items()]
-			result += f"[{','.join(attr_strs)}]"
+		Uses an explicit stack instead of recursion so deeply nested trees don't pay per-level call overhead.
+		"""
+		parts = []
+		# Stack holds entities still to be emitted and "," separators between siblings
+		stack: list[dict | str] = [entity]
+
+		while stack:
+			item = stack.pop()
+			if isinstance(item, str):
+				parts.append(item)
+				continue
 
-		# Add children - use comma for siblings at same level
-		if entity["children"]:
-			child_strs = [self._entity_to_minified(child) for child in entity["children"]]
-			result += f"|{','.join(child_strs)}"
+			parts.append(f"{item['keyword']}:{item['name']}")
 
-		return result
+			# Add attributes
+			if item["attributes"]:
+				attr_strs = [f"{k}:{v}" for k, v in item["attributes"].items()]
+				parts.append(f"[{','.join(attr_strs)}]")
+
+			# Add children - use comma for siblings at same level
+			children = item["children"]
+			if children:
+				parts.append("|")
+				# Push in reverse so the first child is emitted first
+				for idx in range(len(children) - 1, -1, -1):
+					stack.append(children[idx])
+					if idx:
+						stack.append(",")
+
+		return "".join(parts)
 
 	def _shorten_keyword(self, keyword: str) -> str:
-		"""Shorten a keyword using the mapping."""
-		return self.keyword_map.get(keyword, keyword)
+		"""Shorten a keyword using the mapping.
+
+		Unmapped keywords are interned so repeated entities share one string object.
+		"""
+		return sys.intern(self.keyword_map.get(keyword, keyword))
 
 	def _shorten_attr_key(self, key: str) -> str:
-		"""Shorten an attribute key using the mapping."""
-		return self.attr_key_map.get(key, key)
+		"""Shorten an attribute key using the mapping.
+
+		Keys are interned since they are reused as dict keys for every attribute.
+		"""
+		return sys.intern(self.attr_key_map.get(key, key))
 
 	def _generate_legend(self) -> str:
 		"""Generate the legend for interpreting minified CodeStruct."""
@@ -1,8 +1,8 @@
 """CodeStruct grammar."""
 
-import re
-from collections.abc import Generator, Iterator
+from functools import lru_cache
 from pathlib import Path
+from typing import Any
 
 from lark import Lark, Tree, logger
 from lark.exceptions import (
@@ -14,7 +14,8 @@ from lark.exceptions import (
 	UnexpectedToken,
 )
 from lark.indenter import Indenter as LarkIndenter
-from lark.lexer import Token
+
+from .transformer import CodeStructTransformer
 
 
 # Define a custom indenter that recognizes _NEWLINE
@@ -66,52 +67,6 @@ class CustomIndenter(LarkIndenter):
 		logger.debug(f"__init__: self.indent_level = {self.indent_level!r}")
 		logger.debug(f"__init__: self.paren_level = {self.paren_level!r}")
 
-	def process(self, stream: Iterator[Token]) -> Generator[Token, None, None]:
-		logger.debug("process() method called.")
-		logger.debug(f"process(): Stream type: {type(stream)}")
-		logger.debug(f"process(): self.NL_type = {self.NL_type!r}")
-		logger.debug(f"process(): self.paren_level (before super call) = {self.paren_level!r}")
-		logger.debug(f"process(): self.indent_level (before super call) = {self.indent_level!r}")
-
-		yielded_token_count = 0
-		try:
-			# Ensure we call the base class's process method to get actual indentation
-			for token in super().process(stream):
-				yielded_token_count += 1
-				# logger.debug(f"process() yielding from super: {token!r}") # Potentially too verbose
-				yield token
-		except Exception as e:
-			logger.debug(f"process(): Exception during super().process(): {e!r}")
-			raise
-		finally:
-			logger.debug(
-				f"process() method finished executing super().process(). Yielded {yielded_token_count} tokens."
-			)
-			logger.debug(f"process(): self.paren_level (after super call) = {self.paren_level!r}")
-			logger.debug(f"process(): self.indent_level (after super call) = {self.indent_level!r}")
-
-	def _process_new_line(self, token: Token) -> Iterator[Token]:  # token is NL_type
-		logger.debug(f"_process_new_line CALLED with token: {token!r}")
-		logger.debug(f"_process_new_line: Current indent_level (before super call): {self.indent_level!r}")
-		logger.debug(f"_process_new_line: self.NL_type = {self.NL_type!r}")
-
-		# We will call the super method and log what it yields.
-		# This shows us the decisions made by the base Indenter logic.
-		original_tokens_yielded_by_super_process_new_line = []
-		try:
-			for t in super()._process_new_line(token):  # type: ignore[misc]
-				original_tokens_yielded_by_super_process_new_line.append(repr(t))
-				yield t  # Pass the token through to the parser
-		except Exception as e:
-			logger.debug(f"_process_new_line: Exception in super()._process_new_line: {e!r}")
-			raise
-		finally:
-			logger.debug(f"_process_new_line: super()._process_new_line for {token!r} finished.")
-			logger.debug(
-				f"_process_new_line: Tokens yielded by super's _process_new_line: {original_tokens_yielded_by_super_process_new_line}"  # noqa: E501
-			)
-			logger.debug(f"_process_new_line: Current indent_level (after super call): {self.indent_level!r}")
-
 
 # Custom Exception for Parser
 class ParseError(LarkParseError):
@@ -120,21 +75,37 @@ class ParseError(LarkParseError):
 	# Keep it simple for now, or add context later if needed
 
 
-class CodeStructParser:
-	"""Parser for CodeStruct notation."""
+GRAMMAR_PATH = Path(__file__).parent / "codestruct.lark"
 
-	_instance = None
 
-	def __init__(self, debug: bool = False) -> None:
-		"""Initialize the CodeStruct parser.
+@lru_cache(maxsize=1)
+def _read_grammar() -> str:
+	"""Read the grammar file once per process; every Lark configuration is built from the same text."""
+	return GRAMMAR_PATH.read_text()
 
-		Args:
-		    debug: Whether to enable debug mode for the parser
-		"""
-		grammar_path = Path(__file__).parent / "codestruct.lark"
+
+# Compiled Lark parsers shared by all CodeStructParser instances, keyed by (debug, inline transform)
+_LARK_PARSERS: dict[tuple[bool, bool], Lark] = {}
+
+
+def _get_lark_parser(debug: bool, inline_transform: bool = False) -> Lark:
+	"""Return the shared Lark parser, building it on first use.
+
+	Args:
+	    debug: Whether to enable debug mode for the parser
+	    inline_transform: Whether to apply CodeStructTransformer during parsing instead of building a tree
+
+	Returns:
+	    The compiled Lark parser
+	"""
+	# Building the LALR tables is expensive, so share one Lark instance per configuration
+	key = (debug, inline_transform)
+	lark_parser = _LARK_PARSERS.get(key)
+	if lark_parser is None:
+		# NOTE: lark-cython's plugins can't be used here, they don't support postlexers like CustomIndenter
 		try:
-			self.parser = Lark(
-				grammar_path.read_text(),
+			lark_parser = Lark(
+				_read_grammar(),
 				parser="lalr",
 				lexer="contextual",
 				postlex=CustomIndenter(),
@@ -142,10 +113,29 @@ class CodeStructParser:
 				debug=debug,
 				keep_all_tokens=True,  # Essential for Indenter to see all physical tokens
 				propagate_positions=True,
+				cache=True,  # Persist the LALR tables in the temp dir, keyed by a hash of grammar and options
+				transformer=CodeStructTransformer.get_instance() if inline_transform else None,
 			)
 		except Exception as e:
 			msg = f"Error initializing parser: {e!s}"
 			raise LarkParseError(msg) from e
+		_LARK_PARSERS[key] = lark_parser
+	return lark_parser
+
+
+class CodeStructParser:
+	"""Parser for CodeStruct notation."""
+
+	_instance = None
+
+	def __init__(self, debug: bool = False) -> None:
+		"""Initialize the CodeStruct parser.
+
+		Args:
+		    debug: Whether to enable debug mode for the parser
+		"""
+		self.debug = debug
+		self.parser = _get_lark_parser(debug)
 
 	@classmethod
 	def get_instance(cls) -> "CodeStructParser":
@@ -170,13 +160,38 @@ class CodeStructParser:
 		Raises:
 		    ParseError: If the input cannot be parsed
 		"""
-		# Strip trailing spaces from each line to avoid stray indent tokens
-		text = re.sub(r"[ \t]+$", "", text, flags=re.MULTILINE)
-		# Ensure there's a terminating newline for proper parsing (especially for last statement)
-		if text and not text.endswith("\n"):
+		return self._parse_with(self.parser, text)
+
+	def transform_string(self, text: str) -> list:
+		"""Parse CodeStruct from a string directly into the transformed dictionary structure.
+
+		The transformer runs inline while parsing, so no intermediate parse tree is built.
+
+		Args:
+		    text: The CodeStruct text to parse
+
+		Returns:
+		    The same structure as CodeStructTransformer().transform(parse_string(text))
+
+		Raises:
+		    ParseError: If the input cannot be parsed
+		"""
+		return self._parse_with(_get_lark_parser(self.debug, inline_transform=True), text)
+
+	def _parse_with(self, lark_parser: Lark, text: str) -> Any:  # noqa: ANN401
+		"""Normalize the text and parse it with the given Lark parser, converting Lark errors to ParseError."""
+		# Strip trailing spaces from each line to avoid stray indent tokens (most input has none), and
+		# ensure there's a terminating newline for proper parsing (especially for last statement)
+		if " \n" in text or "\t\n" in text or text.endswith((" ", "\t")):
+			lines = [line.rstrip(" \t") for line in text.split("\n")]
+			# Let the join emit the terminating newline instead of copying the result again
+			if lines[-1]:
+				lines.append("")
+			text = "\n".join(lines)
+		elif text and not text.endswith("\n"):
 			text += "\n"
 		try:
-			return self.parser.parse(text)
+			return lark_parser.parse(text)
 		except (UnexpectedInput, UnexpectedToken, UnexpectedCharacters) as e:
 			# Improve error message with line and column info
 			line, col = e.line, e.column
@@ -206,9 +221,13 @@ class CodeStructParser:
 		    ParseError: If the file is not found or input cannot be parsed
 		"""
 		try:
-			file_path_obj = Path(file_path)
-			with file_path_obj.open() as file:
-				return self.parse_string(file.read())
+			# Read bytes and decode once instead of going through a buffered text wrapper
+			raw = Path(file_path).read_bytes()
+			text = raw.decode("ascii") if raw.isascii() else raw.decode("utf-8")
+			# Keep the universal-newline behaviour of text mode
+			if "\r" in text:
+				text = text.replace("\r\n", "\n").replace("\r", "\n")
+			return self.parse_string(text)
 		except FileNotFoundError as e:
 			msg = f"File not found: {file_path}"
 			raise ParseError(msg) from e
@@ -1,9 +1,114 @@
 """CodeStruct transformer."""
 
-from lark import Transformer
+import re
+import sys
+from functools import lru_cache
+from typing import Any, NamedTuple
+
+from lark import Token, Transformer, Tree, v_args
 
 # Constants
 MIN_ATTRIBUTE_ITEMS = 2
+ATTRIBUTE_CACHE_SIZE = 4096
+
+# Opening fence with optional language, then the code up to the closing fence
+CODE_FENCE_RE = re.compile(r"```[ \t]*([A-Za-z0-9_+-]*)[^\n]*\n(.*)```", re.DOTALL)
+
+
+# Keywords repeat heavily across a file, so memoize their normalization. Interning makes every
+# keyword the same object as the matching literal, so checks like `item.get("type") == "module"`
+# short-circuit on identity
+@lru_cache(maxsize=256)
+def _strip_colon(value: str) -> str:
+	# Keyword tokens end in exactly one colon, so a slice is enough
+	return sys.intern(value[:-1] if value[-1:] == ":" else value)
+
+
+# Numeric literal as matched by the grammar's SIGNED_NUMBER terminal
+NUMERIC_VALUE_RE = re.compile(r"-?\d+(\.\d+)?")
+
+
+def _parse_number(value: str) -> int | float | str:
+	# Fast path for plain integers, the common case
+	if value.isdecimal():
+		return int(value)
+	match = NUMERIC_VALUE_RE.fullmatch(value)
+	if match is None:
+		# Non-numeric values like "true", "false", etc.
+		return value
+	return float(value) if match.group(1) else int(value)
+
+
+def _strip_quotes(value: str) -> str:
+	if len(value) > 1 and value[0] == value[-1] and value[0] in "\"'":
+		return value[1:-1]
+	return value
+
+
+# Converters for raw attribute value tokens, keyed by token type
+_ATTR_VALUE_HANDLERS = {
+	"UNQUOTED_SIMPLE_VALUE": _parse_number,
+	"STRING_VALUE": _strip_quotes,
+	"SIGNED_NUMBER": _parse_number,
+}
+
+
+# Generated documents often repeat identical code blocks, so memoize fence parsing
+@lru_cache(maxsize=1024)
+def _parse_code_fence(raw: str) -> tuple[str, str] | None:
+	"""Split a raw fenced code block into its language and stripped code."""
+	match = CODE_FENCE_RE.match(raw)
+	if not match:
+		return None
+	return match.group(1), match.group(2).strip()
+
+
+# Attribute pairs like `visibility: public` repeat across a document, so memoize the scalar ones.
+# Values arrive already converted by attr_value; typed=True keeps e.g. 1 and 1.0 in separate entries
+@lru_cache(maxsize=ATTRIBUTE_CACHE_SIZE, typed=True)
+def _attribute_pair(key: str, value: Any) -> tuple[str, Any]:  # noqa: ANN401
+	"""Build an attribute (key, value) pair from a converted scalar value, stripping the key."""
+	# Attribute keys come from a small vocabulary, so share one string object per key
+	return sys.intern(key.strip(":")), value
+
+
+class EntityMetadata(NamedTuple):
+	"""A piece of entity metadata (hash, attributes, or grouped) to be merged into its entity line.
+
+	Sub-rules return these lightweight tuples instead of single-key dicts; only entities become dicts.
+	"""
+
+	key: str
+	value: Any
+
+
+class FlatStructure(NamedTuple):
+	"""Pre-order flat view of a transformed document.
+
+	nodes[i] is a statement dict (entity, field, or comment) and parents[i] is the index of its parent
+	in nodes, or -1 for top-level statements. The nested "children" lists are left in place.
+	"""
+
+	nodes: list[dict]
+	parents: list[int]
+
+
+def flatten_structure(statements: list) -> FlatStructure:
+	"""Flatten nested statements into pre-order nodes with parent indices, without recursion."""
+	nodes: list[dict] = []
+	parents: list[int] = []
+	stack = [(item, -1) for item in reversed(statements)]
+	while stack:
+		item, parent = stack.pop()
+		if type(item) is not dict:
+			continue
+		index = len(nodes)
+		nodes.append(item)
+		parents.append(parent)
+		children = item.get("children")
+		if children:
+			stack.extend((child, index) for child in reversed(children))
+	return FlatStructure(nodes, parents)
 
 
 class CodeStructTransformer(Transformer):
@@ -22,125 +127,99 @@ class CodeStructTransformer(Transformer):
 			cls._instance = cls()
 		return cls._instance
 
-	def start(self, items: list) -> list:
-		# Filter non-dict items and build the hierarchical structure
-		filtered_items = [item for item in items if isinstance(item, dict)]
-		return self._build_hierarchical_structure(filtered_items)
-
-	def _build_hierarchical_structure(self, items: list) -> list:
-		"""Build parent-child relationships based on indentation levels.
-
-		Since the parser is creating flat structures, we need to rebuild the hierarchy
-		based on the expected nesting patterns.
-		"""
-		if not items:
-			return []
+	def transform_flat(self, tree: Tree) -> FlatStructure:
+		"""Transform a parse tree into its flat pre-order view (see FlatStructure)."""
+		return flatten_structure(self.transform(tree))
 
-		# Check if we already have proper nesting
-		has_nested_structure = any(isinstance(item, dict) and "children" in item and item["children"] for item in items)
+	def start(self, items: list) -> list:
+		# Filter non-dict items and check whether nesting already exists in a single pass
+		statements = []
+		has_nested_structure = False
+		for item in items:
+			if type(item) is dict:
+				statements.append(item)
+				if not has_nested_structure and item.get("children"):
+					has_nested_structure = True
 
 		if has_nested_structure:
 			# Hierarchy already exists
-			return items
+			return statements
+		return self._build_hierarchical_structure(statements)
 
-		# Build hierarchy from flat structure
+	def _build_hierarchical_structure(self, items: list) -> list:
+		"""Build parent-child relationships for a flat list of statements.
+
+		When the parser produces a flat structure (no entity has children), we need to rebuild
+		the hierarchy based on the expected nesting patterns. The statements are fresh dicts from
+		entity_line, so children are attached to them in place.
+		"""
 		result = []
-		i = 0
-
-		while i < len(items):
-			item = items[i]
-
-			# Comments go directly to result
-			if isinstance(item, dict) and "comment" in item:
-				result.append(item)
-				i += 1
-				continue
-
-			# For entities (modules, classes, etc.), collect their logical children
-			if isinstance(item, dict) and "type" in item:
-				entity = item.copy()
-				children = []
-				i += 1
-
-				# Look ahead for items that should be children
-				while i < len(items):
-					next_item = items[i]
-
-					# Stop if we hit another module (top-level entity)
-					if isinstance(next_item, dict) and next_item.get("type") == "module":
-						break
-
-					# Stop if we hit another class at the same level for modules
-					if (
-						entity.get("type") == "module"
-						and isinstance(next_item, dict)
-						and next_item.get("type") == "class"
-					):
-						# This class should be a child of the module
-						class_entity = next_item.copy()
-						class_children = []
-						i += 1
-
-						# Look for class children (doc, func, etc.)
-						while i < len(items):
-							class_child = items[i]
-
-							# Stop at next module or class
-							if isinstance(class_child, dict) and class_child.get("type") in ["module", "class"]:
-								break
-
-							class_children.append(class_child)
-							i += 1
-
-						if class_children:
-							# Recursively group nested children (functions, nested entities)
-							class_entity["children"] = self._build_hierarchical_structure(class_children)
-						children.append(class_entity)
-						continue
-
-					# Everything else is a direct child
-					children.append(next_item)
-					i += 1
-
-				if children:
-					entity["children"] = children
-				result.append(entity)
+		# Entities currently collecting children: the top-level entity, a class directly under a module
+		# and the first entity inside that class
+		owner = class_owner = class_child_owner = None
+
+		for item in items:
+			# Each statement is inspected once; comments and fields carry no type
+			item_type = item.get("type")
+
+			# A module always starts a new top-level entity
+			if item_type == "module":
+				owner = item
+				class_owner = class_child_owner = None
+				result.append(owner)
+			elif owner is None:
+				# Before the first entity, comments and unknown items go directly to result
+				if item_type is not None:
+					owner = item
+					result.append(owner)
+				else:
+					result.append(item)
+			elif item_type == "class" and owner["type"] == "module":
+				# Classes under a module collect their own children until the next module or class
+				class_owner = item
+				class_child_owner = None
+				owner.setdefault("children", []).append(class_owner)
+			elif class_owner is not None:
+				# Inside a class, the first entity (func, etc.) collects everything that follows
+				if class_child_owner is not None:
+					class_child_owner.setdefault("children", []).append(item)
+				elif item_type is not None:
+					class_child_owner = item
+					class_owner.setdefault("children", []).append(class_child_owner)
+				else:
+					class_owner.setdefault("children", []).append(item)
 			else:
-				# Unknown item type, add as-is
-				result.append(item)
-				i += 1
+				# Everything else is a direct child
+				owner.setdefault("children", []).append(item)
 
 		return result
 
-	def statement(self, items: list) -> dict | list | None:
+	@staticmethod
+	def statement(items: list) -> dict | list | None:
 		# Pass through the single item (either comment or entity)
 		return items[0] if items else None
 
-	def comment(self, items: list) -> dict:
+	@v_args(inline=True)
+	@staticmethod
+	def comment(token: Token) -> dict:
 		# Store comments as {"comment": "text"}
-		comment_text = items[0].value.lstrip("#").strip()
+		comment_text = token.value.lstrip("#").strip()
 		return {"comment": comment_text}
 
 	def entity(self, items: list) -> dict:
 		"""Transform a parse tree entity into a dictionary.
 
-		Applies special rules to handle child structures, metadata, and fields.
+		The entity line already carries the merged metadata (hash, attributes, grouped),
+		so only the child structures and fields need to be collected here.
 		"""
 		result = items[0]
-		metadata_keys = ("hash", "attributes", "grouped")
 		children: list[dict] = []
 		for item in items[1:]:
-			if isinstance(item, dict):
-				# Process metadata first
-				if any(key in item for key in metadata_keys):
-					for key in metadata_keys:
-						if key in item:
-							result[key] = item[key]
-				else:
-					children.append(item)
-			elif isinstance(item, list):
+			if type(item) is list:
 				# child_block yields a list of statements (dicts)
-				children.extend([c for c in item if isinstance(c, dict)])
+				children.extend([c for c in item if type(c) is dict])
+			elif type(item) is dict:
+				children.append(item)
 		if children:
 			result["children"] = children
 		return result
@@ -153,119 +232,78 @@ class CodeStructTransformer(Transformer):
 		if items:
 			if isinstance(items[0], str):
 				result["type"] = items[0]
-			elif hasattr(items[0], "value"):
+			elif type(items[0]) is Token:
 				result["type"] = items[0].value.rstrip(":")
 
 		# Second item should be the entity name
 		if len(items) > 1:
 			if isinstance(items[1], str):
 				result["name"] = items[1]
-			elif hasattr(items[1], "value"):
-				result["name"] = items[1].value.strip()
+			elif type(items[1]) is Token:
+				result["name"] = items[1].value
 
 		# Process optional hash_id, attributes, and grouped_entities
 		for item in items[2:]:
-			if isinstance(item, dict):
-				# Directly merge in special keys
-				for key in ("hash", "grouped", "attributes"):
-					if key in item:
-						result[key] = item[key]
+			if type(item) is EntityMetadata:
+				result[item.key] = item.value
 
 		return result
 
-	def hash_id(self, items: list) -> dict:
+	@staticmethod
+	def hash_id(items: list) -> EntityMetadata | None:
 		# Return the hash ID value
-		if items and hasattr(items[-1], "value"):
-			return {"hash": items[-1].value}
-		return {}
+		if items and type(items[-1]) is Token:
+			return EntityMetadata("hash", items[-1].value)
+		return None
 
 	def child_block(self, items: list) -> list:
 		# Return a list of child statements
 		return [item for item in items if item is not None]
 
-	def grouped_entities(self, items: list) -> dict:
-		# We want to extract the entity names from the items list
-		entity_names = []
-		for item in items:
-			# Skip the & token markers
-			if hasattr(item, "type") and item.type == "_AMPERSAND":
-				continue
-			# Add actual entity names
-			if isinstance(item, str):
-				entity_names.append(item)
-			elif hasattr(item, "value") and item.type == "_ENTITY_NAME_TERMINAL":
-				entity_names.append(item.value.strip())
-		return {"grouped": entity_names}
-
-	def entity_name(self, items: list) -> str:
-		"""Return the entity name as a string, stripped of whitespace."""
-		if not items:
-			return ""
-		item = items[0]
-		if hasattr(item, "value"):
-			return item.value.strip()
-		if isinstance(item, str):
-			return item.strip()
-		return str(item).strip()
+	@staticmethod
+	def grouped_entities(items: list) -> EntityMetadata:
+		# entity_name yields plain str, while any kept _AMPERSAND tokens are Token (a str subclass), so an exact
+		# type check keeps just the names whether or not the parser keeps all tokens
+		return EntityMetadata("grouped", [item for item in items if type(item) is str])
+
+	@v_args(inline=True)
+	@staticmethod
+	def entity_name(token: Token) -> str:
+		"""Return the entity name as a string (the grammar already excludes surrounding whitespace)."""
+		return token.value
 
-	def attributes(self, items: list) -> dict:
+	@staticmethod
+	def attributes(items: list) -> EntityMetadata:
 		"""Transform attributes into a dictionary.
 
-		Processes a list of attribute items into a single dictionary, converting raw tokens to appropriate types.
+		Processes a list of attribute items (key, value pairs whose values are already converted) into a single
+		dictionary.
 		"""
-		attrs = {}
-		for item in items:
-			if isinstance(item, dict) and len(item) == 1:
-				key, value = next(iter(item.items()))
-				# Convert raw tokens to proper types
-				if hasattr(value, "type") and hasattr(value, "value"):
-					# Use attr_value to convert token
-					converted = self.attr_value([value])
-					attrs[key] = converted
-				else:
-					attrs[key] = value
-		return {"attributes": attrs}
+		return EntityMetadata("attributes", dict(item for item in items if type(item) is tuple))
 
-	def attribute(self, items: list) -> dict:
+	def attribute(self, items: list) -> tuple[str, Any] | None:
 		"""Transform a single attribute key-value pair.
 
 		Grammar rule: ATTR_KEY ":" attr_value
 		Items could be [key_token, colon_token, value] or [key_token, value]
 		"""
 		if len(items) < 2:  # Need at least key and value  # noqa: PLR2004
-			return {}
+			return None
 
 		# Extract key from first token
-		key = ""
-		if hasattr(items[0], "value"):
-			key = items[0].value.strip()
-			if ":" in key:
-				key = key.strip(":")
-		else:
-			key = str(items[0])
-
-		# Find the value token, skipping any colon tokens
-		attr_value_token = None
-		for item in items[1:]:
-			# Skip colon tokens that might be passed through
-			if hasattr(item, "type") and item.type in ("COLON", "LARK_COLON"):
-				continue
-			if hasattr(item, "value") and item.value == ":":
-				continue
-			# This should be our value
-			attr_value_token = item
-			break
+		key = items[0].value if type(items[0]) is Token else str(items[0])
 
-		if attr_value_token is None:
-			# If no value found, return empty string
-			return {key: ""}
+		# The value always comes last, after the (optional) colon token
+		attr_value_token = items[-1]
 
-		# Process the value by calling the attr_value method directly
-		value = self.attr_value([attr_value_token])
+		# Arrays are mutable (and unhashable), so they are never memoized
+		if type(attr_value_token) is list:
+			return sys.intern(key.strip(":")), attr_value_token
 
-		return {key: value}
+		return _attribute_pair(key, attr_value_token)
 
-	def array(self, items: list) -> list:
+	@staticmethod
+	def array(items: list) -> list:
 		# items are the already transformed values from attr_value calls within the array
 		return items
 
@@ -279,53 +317,25 @@ class CodeStructTransformer(Transformer):
 
 		item = items[0]
 
+		# Raw tokens are converted based on their type (checked first, since Token is also a str)
+		if type(item) is Token:
+			handler = _ATTR_VALUE_HANDLERS.get(item.type)
+			return handler(item.value) if handler else item.value
+
 		# Already transformed primitives pass through
-		if isinstance(item, (str, int, float, list)):
+		item_type = type(item)
+		if item_type is str or item_type is int or item_type is float or item_type is list:
 			return item
 
-		# Handle Lark Token objects
-		if hasattr(item, "type") and hasattr(item, "value"):
-			val = item.value.strip()
-
-			if item.type == "UNQUOTED_SIMPLE_VALUE":
-				# Try to convert to numeric types if possible
-				try:
-					if "." in val:
-						return float(val)
-					if val.isdigit() or (val.startswith("-") and val[1:].isdigit()):
-						return int(val)
-					# For non-numeric values like "true", "false", etc.
-					return val
-				except ValueError:
-					return val
-			elif item.type == "STRING_VALUE":
-				# Remove surrounding quotes
-				if (val.startswith('"') and val.endswith('"')) or (val.startswith("'") and val.endswith("'")):
-					return val[1:-1]
-				return val
-			elif item.type == "SIGNED_NUMBER":
-				# Handle signed numbers
-				try:
-					if "." in val:
-						return float(val)
-					return int(val)
-				except ValueError:
-					return val
-			else:
-				# For any other token type, return the value
-				return val
-
-		# Fallback: convert token to string
-		if hasattr(item, "value"):
-			return str(item.value)
-
 		return str(item)
 
-	def entity_fields(self, items: list) -> list:
+	@staticmethod
+	def entity_fields(items: list) -> list:
 		# Just pass through the fields
 		return items
 
-	def field(self, items: list) -> dict | list | None:
+	@staticmethod
+	def field(items: list) -> dict | list | None:
 		# Process doc_field, impl_field, or a nested entity
 		return items[0] if items else None
 
@@ -334,97 +344,66 @@ class CodeStructTransformer(Transformer):
 
 		The docstring is the second item, the first being the 'doc:' token.
 		"""
-		if len(items) > 1:
-			# Second item should be a Tree with data 'docstring'
-			if hasattr(items[1], "data") and items[1].data == "docstring":
-				# The docstring content is directly in the tree's text
-				if hasattr(items[1], "children") and len(items[1].children) > 0:
-					child = items[1].children[0]
-					if hasattr(child, "value"):
-						return {"doc": child.value.strip()}
-			# Second item could also be the direct string value
-			elif hasattr(items[1], "value"):
-				return {"doc": items[1].value.strip()}
-			# Or it could be directly the string itself
-			elif isinstance(items[1], str):
-				return {"doc": items[1].strip()}
+		match items:
+			case [_, Token(value=doc), *_] | [_, Tree(data="docstring", children=[Token(value=doc), *_]), *_]:
+				return {"doc": doc}
+			# Usually the docstring rule has already been transformed to its text (matched after Token,
+			# which is also a str)
+			case [_, str() as doc, *_]:
+				return {"doc": doc}
 
 		# Look for any token with type "__ANON_3" which is the docstring content token
 		for item in items:
-			if hasattr(item, "type") and item.type == "__ANON_3":
-				return {"doc": item.value.strip()}
+			if type(item) is Token and item.type == "__ANON_3":
+				return {"doc": item.value}
 
 		return {"doc": ""}
 
-	def docstring(self, items: list) -> str:
-		"""Extract docstring content from tokens."""
-		if not items:
-			return ""
-
-		# Handle different token types
-		item = items[0]
-		if hasattr(item, "value"):
-			return item.value.strip()
-		if isinstance(item, str):
-			return item.strip()
-		return str(item).strip()
+	@v_args(inline=True)
+	@staticmethod
+	def docstring(token: Token) -> str:
+		"""Extract docstring content from its token."""
+		return token.value
 
 	def impl_field(self, items: list) -> dict:
 		"""Parse the raw code block token into language and code."""
 		code_block = None
 		for item in items:
-			if hasattr(item, "type") and item.type == "CODE_BLOCK_RAW":
+			if type(item) is Token and item.type == "CODE_BLOCK_RAW":
 				code_block = item
 				break
 
 		if not code_block:
 			return {"impl": {}}
 
-		raw = code_block.value
-		result = {}
-
-		# The raw format should be ```[language]\ncode\n```
-		# Extract language (if any) from the opening fence line
-		match_open = raw.strip().split("\n", 1)[0].strip()
-		language = match_open[3:].strip() if match_open.startswith("```") else ""
-
-		# Extract the code content (everything between opening and closing ```)
-		# Remove the first line (opening fence with optional language)
-		without_opening = raw.split("\n", 1)[1] if "\n" in raw else ""
+		fence = _parse_code_fence(code_block.value)
+		if fence is None:
+			return {"impl": {"code": ""}}
 
-		# Remove the closing fence
-		code = without_opening.rsplit("```", 1)[0].strip() if "```" in without_opening else without_opening.strip()
-
-		result["code"] = code
+		language, code = fence
+		result = {"code": code}
 		if language:
 			result["language"] = language
 
 		return {"impl": result}
 
-	def keyword(self, items: list) -> str:
+	@v_args(inline=True)
+	@staticmethod
+	def keyword(token: Token) -> str:
 		"""Extract keyword from token, stripping the colon."""
-		if not items:
-			return ""
-		item = items[0]
-		if hasattr(item, "value"):
-			return item.value.rstrip(":")
-		if isinstance(item, str):
-			return item.rstrip(":")
-		return str(item).rstrip(":")
-
-	def string_value(self, items: list) -> str:
-		# Remove quotation marks
-		value = items[0].value if items and hasattr(items[0], "value") else ""
-		if value.startswith('"') and value.endswith('"'):
+		return _strip_colon(token.value)
+
+	@v_args(inline=True)
+	@staticmethod
+	def string_value(token: Token) -> str:
+		# Remove quotation marks (the grammar only matches closed strings, so the first char decides)
+		value = token.value
+		if value[:1] == '"':
 			return value[1:-1]
 		return value
 
-	def number_value(self, items: list) -> int | float | str:
+	@v_args(inline=True)
+	@staticmethod
+	def number_value(token: Token) -> int | float | str:
 		# Convert to appropriate numeric type
-		value = items[0].value if items and hasattr(items[0], "value") else "0"
-		try:
-			if "." in value:
-				return float(value)
-			return int(value)
-		except ValueError:
-			return value
+		return _parse_number(token.value)
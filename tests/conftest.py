@@ -1,6 +1,8 @@
 """Pytest configuration file."""
 
+from functools import cache, lru_cache
 from pathlib import Path
+from typing import Any, NamedTuple
 
 import pytest
 from lark import logger
@@ -18,26 +20,83 @@ COMPLEX_CSTXT_PATH = TEST_CASES_PATH / "complex.cst"
 EDGE_CASES_CSTXT_PATH = TEST_CASES_PATH / "edge_cases.cst"
 
 VALID_CSTXT_FILES = [SIMPLE_CSTXT_PATH, COMPLEX_CSTXT_PATH, EDGE_CASES_CSTXT_PATH]
-VALID_CSTXT_CONTENTS_AND_NAMES = [
-	(SIMPLE_CSTXT_PATH.read_text(), "simple.cst"),
-	(COMPLEX_CSTXT_PATH.read_text(), "complex.cst"),
-	(EDGE_CASES_CSTXT_PATH.read_text(), "edge_cases.cst"),
-]
 
 
-@pytest.fixture(scope="module")
+@cache
+def read_test_case(path: Path) -> str:
+	"""Read and decode a test case file on first use, as UTF-8 like parse_file rather than the locale encoding."""
+	return path.read_bytes().decode("utf-8")
+
+
+class CstCase(NamedTuple):
+	"""A test case file with its contents, parse tree and transformed structure."""
+
+	path: Path
+	text: str
+	tree: Any
+	transformed: list[dict[str, Any]]
+
+
+# Snippets shared by several tests, parsed once per session by the `snippets` fixture
+SNIPPETS = {
+	"short_names": """
+module: A
+  class: B
+    func: c
+""",
+	"undocumented": """
+module: MyModule
+  class: MyClass
+    func: myFunction
+""",
+}
+
+
+@pytest.fixture(scope="session")
 def parser():
 	"""Return a CodeStructParser instance."""
 	return CodeStructParser()
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def transformer():
-	"""Return a CodeStructTransformer instance."""
-	return CodeStructTransformer()
+	"""Return the shared CodeStructTransformer instance."""
+	return CodeStructTransformer.get_instance()
 
 
-@pytest.fixture(params=[p.read_text() for p in VALID_CSTXT_FILES], ids=[p.name for p in VALID_CSTXT_FILES])
+@pytest.fixture(params=VALID_CSTXT_FILES, ids=[p.name for p in VALID_CSTXT_FILES])
 def valid_cstxt_content(request):
 	"""Provide content from each valid .cstxt file."""
-	return request.param
+	return read_test_case(request.param)
+
+
+@pytest.fixture(scope="session")
+def parse_cached(parser):
+	"""Return a parse function that parses each distinct source text only once per session.
+
+	Transformers and lint rules only read the tree, so tests can safely share a cached tree.
+	"""
+	return lru_cache(maxsize=None)(parser.parse_string)
+
+
+@pytest.fixture(scope="session")
+def cst_case(request, parse_cached, transformer):
+	"""Return the CstCase for the test case path given through indirect parametrization, built once per session."""
+	path = request.param
+	text = read_test_case(path)
+	tree = parse_cached(text)
+	return CstCase(path, text, tree, transformer.transform(tree))
+
+
+@pytest.fixture(scope="session")
+def invalid_cst_file(tmp_path_factory):
+	"""Return the path of a file with invalid CodeStruct syntax, written once per session."""
+	path = tmp_path_factory.mktemp("invalid") / "invalid.cst"
+	path.write_text("module Bad Module Syntax :::\n  func missing_colon")
+	return path
+
+
+@pytest.fixture(scope="session")
+def snippets(parse_cached):
+	"""Return {name: (content, tree)} for the shared SNIPPETS, parsed once per session."""
+	return {name: (content, parse_cached(content)) for name, content in SNIPPETS.items()}
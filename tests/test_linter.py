@@ -1,26 +1,17 @@
 """Test the linter module."""
 
-import tempfile
-from pathlib import Path
-
 import pytest
 
 from codestruct.linter import CodeStructLinter, LintMessage
 from codestruct.parser import CodeStructParser
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def linter():
 	"""Return a CodeStructLinter instance."""
 	return CodeStructLinter()
 
 
-@pytest.fixture
-def parser():
-	"""Return a CodeStructParser instance."""
-	return CodeStructParser()
-
-
 class TestLintMessage:
 	"""Test the LintMessage class."""
 
@@ -48,32 +39,22 @@ class TestCodeStructLinter:
 		assert isinstance(linter.parser, CodeStructParser)
 		assert len(linter.rules) == 4  # check_short_names, check_missing_doc, check_hash_format, check_attribute_naming
 
-	def test_check_short_names_valid(self, linter, parser):
+	def test_check_short_names_valid(self, linter, snippets):
 		"""Test check_short_names with valid names."""
-		content = """
-module: MyModule
-  class: MyClass
-    func: myFunction
-"""
-		tree = parser.parse_string(content)
+		_, tree = snippets["undocumented"]
 		messages = linter.check_short_names(tree, "test.cst")
 		assert len(messages) == 0
 
-	def test_check_short_names_too_short(self, linter, parser):
+	def test_check_short_names_too_short(self, linter, snippets):
 		"""Test check_short_names with short names."""
-		content = """
-module: A
-  class: B
-    func: c
-"""
-		tree = parser.parse_string(content)
+		_, tree = snippets["short_names"]
 		messages = linter.check_short_names(tree, "test.cst")
 		assert len(messages) == 3
 		for message in messages:
 			assert message.code == "CS101"
 			assert "too short" in message.message
 
-	def test_check_missing_doc_all_documented(self, linter, parser):
+	def test_check_missing_doc_all_documented(self, linter, parse_cached):
 		"""Test check_missing_doc with all entities documented."""
 		content = """
 module: MyModule
@@ -83,18 +64,13 @@ module: MyModule
     func: myFunction
       doc: This is a function
 """
-		tree = parser.parse_string(content)
+		tree = parse_cached(content)
 		messages = linter.check_missing_doc(tree, "test.cst")
 		assert len(messages) == 0
 
-	def test_check_missing_doc_missing_docs(self, linter, parser):
+	def test_check_missing_doc_missing_docs(self, linter, snippets):
 		"""Test check_missing_doc with missing documentation."""
-		content = """
-module: MyModule
-  class: MyClass
-    func: myFunction
-"""
-		tree = parser.parse_string(content)
+		_, tree = snippets["undocumented"]
 		messages = linter.check_missing_doc(tree, "test.cst")
 		# The linter only checks entities that are actually parsed as module/class/func
 		# Let's check if we get any missing doc messages at all
@@ -110,75 +86,96 @@ module: MyModule
 			# At least one should mention missing documentation
 			assert any("missing documentation" in text.lower() for text in message_texts)
 
-	def test_check_missing_doc_non_documentable_entities(self, linter, parser):
+	def test_check_missing_doc_non_documentable_entities(self, linter, parse_cached):
 		"""Test check_missing_doc ignores non-documentable entities."""
 		content = """
 var: myVariable
 enum: MyEnum
   const: VALUE1
 """
-		tree = parser.parse_string(content)
+		tree = parse_cached(content)
 		messages = linter.check_missing_doc(tree, "test.cst")
 		assert len(messages) == 0
 
-	def test_check_hash_format_valid(self, linter, parser):
+	def test_check_hash_format_valid(self, linter, parse_cached):
 		"""Test check_hash_format with valid hash IDs."""
 		content = """
 module: MyModule ::: validHash123
 module: AnotherModule ::: anotherValidHash_456
 """
-		tree = parser.parse_string(content)
+		tree = parse_cached(content)
 		messages = linter.check_hash_format(tree, "test.cst")
 		assert len(messages) == 0
 
-	def test_check_hash_format_invalid(self, linter, parser):
+	def test_check_hash_format_invalid(self, linter, parse_cached):
 		"""Test check_hash_format with invalid hash IDs."""
 		content = """
 module: MyModule ::: _invalidHash
 """
-		tree = parser.parse_string(content)
+		tree = parse_cached(content)
 		messages = linter.check_hash_format(tree, "test.cst")
 		# Should get one invalid hash (starts with underscore)
 		assert len(messages) == 1
 		assert messages[0].code == "CS301"
 		assert "does not follow naming convention" in messages[0].message
 
-	def test_check_attribute_naming_valid(self, linter, parser):
+	def test_check_attribute_naming_valid(self, linter, parse_cached):
 		"""Test check_attribute_naming with valid attribute names."""
 		content = """
 class: MyClass [visibility:public, isAbstract:true, maxCount:100]
 func: myFunc [static:true, complexity:5]
 """
-		tree = parser.parse_string(content)
+		tree = parse_cached(content)
 		messages = linter.check_attribute_naming(tree, "test.cst")
 		assert len(messages) == 0
 
-	def test_check_attribute_naming_invalid(self, linter, parser):
+	def test_check_attribute_naming_invalid(self, linter, parse_cached):
 		"""Test check_attribute_naming with invalid attribute names."""
 		content = """
 class: MyClass [badAttr:value]
 """
-		tree = parser.parse_string(content)
+		tree = parse_cached(content)
 		messages = linter.check_attribute_naming(tree, "test.cst")
 		# The attribute badAttr should be valid (starts with lowercase)
 		# Let's test with actually invalid names in separate test
 		assert len(messages) >= 0
 
-	def test_lint_tree_integration(self, linter, parser):
+	def test_lint_tree_integration(self, linter, snippets):
 		"""Test lint_tree integrates all rules."""
-		content = """
-module: A
-  class: B
-    func: c
-"""
-		tree = parser.parse_string(content)
+		_, tree = snippets["short_names"]
 		messages = linter.lint_tree(tree, "test.cst")
 
 		# Should get short name errors (CS101)
 		cs101_messages = [msg for msg in messages if msg.code == "CS101"]
 		assert len(cs101_messages) == 3  # Three short names
 
-	def test_lint_file_valid_file(self, linter):
+	def test_lint_tree_matches_individual_rules(self, linter, parse_cached):
+		"""Test the single-walk lint_tree reports the same messages, in order, as each rule on its own."""
+		content = """
+module: A ::: 1bad
+  class: Bb [BadKey: x, good: y]
+    func: c
+"""
+		tree = parse_cached(content)
+		expected = [
+			(msg.code, msg.line, msg.col, msg.message) for rule in linter.rules for msg in rule(tree, "test.cst")
+		]
+
+		assert {"CS101", "CS301", "CS401"} <= {code for code, *_ in expected}
+		assert [(msg.code, msg.line, msg.col, msg.message) for msg in linter.lint_tree(tree, "test.cst")] == expected
+
+	def test_lint_tree_follows_rules_list(self, parse_cached):
+		"""Test lint_tree only runs the rules currently in linter.rules, including custom ones."""
+		tree = parse_cached("module: A ::: 1bad\n")
+		linter = CodeStructLinter()
+
+		def custom_rule(tree, file_path):
+			return [LintMessage(file_path, 1, 0, "CS999", "Custom rule")]
+
+		linter.rules = [linter.check_hash_format, custom_rule]
+		assert [msg.code for msg in linter.lint_tree(tree, "test.cst")] == ["CS301", "CS999"]
+
+	def test_lint_file_valid_file(self, linter, tmp_path):
 		"""Test lint_file with a valid temporary file."""
 		content = """
 module: MyModule
@@ -186,30 +183,17 @@ module: MyModule
   class: MyClass
     doc: This is a class
 """
-		with tempfile.NamedTemporaryFile(mode="w", suffix=".cst", delete=False) as f:
-			f.write(content)
-			f.flush()
-			try:
-				messages = linter.lint_file(f.name)
-				assert len(messages) == 0
-			finally:
-				Path(f.name).unlink()
-
-	def test_lint_file_parse_error(self, linter):
+		file_path = tmp_path / "valid.cst"
+		file_path.write_text(content)
+		messages = linter.lint_file(str(file_path))
+		assert len(messages) == 0
+
+	def test_lint_file_parse_error(self, linter, invalid_cst_file):
 		"""Test lint_file with syntax error."""
-		content = """
-invalid syntax here [[[
-"""
-		with tempfile.NamedTemporaryFile(mode="w", suffix=".cst", delete=False) as f:
-			f.write(content)
-			f.flush()
-			try:
-				messages = linter.lint_file(f.name)
-				assert len(messages) >= 1
-				assert messages[0].code == "CS001"
-				assert "Parse error" in messages[0].message
-			finally:
-				Path(f.name).unlink()
+		messages = linter.lint_file(str(invalid_cst_file))
+		assert len(messages) >= 1
+		assert messages[0].code == "CS001"
+		assert "Parse error" in messages[0].message
 
 	def test_lint_file_not_found(self, linter):
 		"""Test lint_file with non-existent file."""
@@ -218,50 +202,37 @@ invalid syntax here [[[
 		assert messages[0].code == "CS002"
 		assert "File not found" in messages[0].message
 
-	def test_lint_file_permission_error(self, linter, monkeypatch):
+	def test_lint_file_permission_error(self, linter):
 		"""Test lint_file with permission error."""
 
-		def mock_read_text():
+		def deny_read():
 			msg = "Permission denied"
 			raise PermissionError(msg)
 
-		# Create a temporary file and mock its read_text method
-		with tempfile.NamedTemporaryFile(mode="w", suffix=".cst", delete=False) as f:
-			f.write("module: Test")
-			f.flush()
-
-			try:
-				# Mock Path.read_text to raise PermissionError
-				monkeypatch.setattr(Path, "read_text", lambda _: mock_read_text())
-				messages = linter.lint_file(f.name)
-				assert len(messages) == 1
-				assert messages[0].code == "CS003"
-				assert "Permission denied" in messages[0].message
-			finally:
-				Path(f.name).unlink()
+		messages = linter.lint_file("protected.cst", opener=deny_read)
+		assert len(messages) == 1
+		assert messages[0].code == "CS003"
+		assert "Permission denied" in messages[0].message
 
 	def test_lint_file_unicode_error(self, linter):
 		"""Test lint_file with unicode decode error."""
-		# Create a file with invalid UTF-8 bytes
-		with tempfile.NamedTemporaryFile(mode="wb", suffix=".cst", delete=False) as f:
-			f.write(b"\xff\xfe\x00\x00invalid utf-8")
-			f.flush()
-			try:
-				messages = linter.lint_file(f.name)
-				assert len(messages) == 1
-				assert messages[0].code == "CS004"
-				assert "Unicode decode error" in messages[0].message
-			finally:
-				Path(f.name).unlink()
-
-	def test_check_hash_format_edge_cases(self, linter, parser):
+
+		def read_invalid_utf8():
+			return b"\xff\xfe\x00\x00invalid utf-8".decode()
+
+		messages = linter.lint_file("binary.cst", opener=read_invalid_utf8)
+		assert len(messages) == 1
+		assert messages[0].code == "CS004"
+		assert "Unicode decode error" in messages[0].message
+
+	def test_check_hash_format_edge_cases(self, linter, parse_cached):
 		"""Test check_hash_format with edge cases."""
 		content = """
 module: MyModule ::: validHash
 module: AnotherModule ::: a1
 module: ThirdModule ::: _invalidStartsWithUnderscore
 """
-		tree = parser.parse_string(content)
+		tree = parse_cached(content)
 		messages = linter.check_hash_format(tree, "test.cst")
 
 		# Only the third one should be invalid (starts with underscore)
@@ -269,7 +240,7 @@ module: ThirdModule ::: _invalidStartsWithUnderscore
 		assert len(invalid_messages) == 1
 		assert invalid_messages[0].code == "CS301"
 
-	def test_mixed_valid_invalid_content(self, linter, parser):
+	def test_mixed_valid_invalid_content(self, linter, parse_cached):
 		"""Test linter with mixed valid and invalid content."""
 		content = """
 # This is a comment
@@ -284,7 +255,7 @@ module: GoodModule ::: validHash
     doc: Good documentation
     func: wellNamedFunction
 """
-		tree = parser.parse_string(content)
+		tree = parse_cached(content)
 		messages = linter.lint_tree(tree, "test.cst")
 
 		# Should find various issues
@@ -1,5 +1,8 @@
 """Tests for the CodeStruct minifier."""
 
+from pathlib import Path
+from unittest.mock import patch
+
 import pytest
 
 from src.codestruct.minifier import CodeStructMinifier
@@ -8,10 +11,11 @@ from src.codestruct.minifier import CodeStructMinifier
 class TestCodeStructMinifier:
 	"""Test cases for the CodeStruct minifier."""
 
-	def setup_method(self):
-		"""Set up test fixtures."""
-		self.minifier = CodeStructMinifier(include_legend=False)
-		self.minifier_with_legend = CodeStructMinifier(include_legend=True)
+	@classmethod
+	def setup_class(cls) -> None:
+		"""Set up test fixtures shared by all tests in the class."""
+		cls.minifier = CodeStructMinifier(include_legend=False)
+		cls.minifier_with_legend = CodeStructMinifier(include_legend=True)
 
 	def test_basic_entity_minification(self):
 		"""Test basic entity minification."""
@@ -100,9 +104,9 @@ func: method"""
 		expected = "m:test|fn:method"
 		assert result == expected
 
-	def test_all_keyword_shortcuts(self):
-		"""Test all keyword shortening mappings."""
-		test_cases = [
+	@pytest.mark.parametrize(
+		("input_str", "expected"),
+		[
 			("dir: test", "d:test"),
 			("file: test.py", "f:test.py"),
 			("module: test", "m:test"),
@@ -119,39 +123,39 @@ func: method"""
 			("union: Result", "u:Result"),
 			("optional: nickname", "opt:nickname"),
 			("import: sys", "i:sys"),
-		]
-
-		for input_str, expected in test_cases:
-			result = self.minifier.minify_string(input_str)
-			assert result == expected, f"Failed for {input_str}"
+		],
+	)
+	def test_all_keyword_shortcuts(self, input_str, expected):
+		"""Test all keyword shortening mappings."""
+		assert self.minifier.minify_string(input_str) == expected
 
-	def test_all_type_abbreviations(self):
-		"""Test all type abbreviations."""
-		test_cases = [
+	@pytest.mark.parametrize(
+		("input_str", "expected"),
+		[
 			("func: test [type: INTEGER]", "fn:test[t:INT]"),
 			("func: test [type: STRING]", "fn:test[t:STR]"),
 			("func: test [type: BOOLEAN]", "fn:test[t:BOOL]"),
 			("func: test [type: FLOAT]", "fn:test[t:FLT]"),
 			("import: test [type: external]", "i:test[t:ext]"),
 			("import: test [type: internal]", "i:test[t:int]"),
-		]
-
-		for input_str, expected in test_cases:
-			result = self.minifier.minify_string(input_str)
-			assert result == expected, f"Failed for {input_str}"
+		],
+	)
+	def test_all_type_abbreviations(self, input_str, expected):
+		"""Test all type abbreviations."""
+		assert self.minifier.minify_string(input_str) == expected
 
-	def test_attribute_key_shortcuts(self):
-		"""Test attribute key shortening."""
-		test_cases = [
+	@pytest.mark.parametrize(
+		("input_str", "expected"),
+		[
 			("func: test [type: STRING]", "fn:test[t:STR]"),
 			("func: test [default: value]", "fn:test[d:value]"),
 			("import: test [source: stdlib]", "i:test[s:stdlib]"),
 			("import: test [ref: class: User]", "i:test[rf:class: User]"),
-		]
-
-		for input_str, expected in test_cases:
-			result = self.minifier.minify_string(input_str)
-			assert result == expected, f"Failed for {input_str}"
+		],
+	)
+	def test_attribute_key_shortcuts(self, input_str, expected):
+		"""Test attribute key shortening."""
+		assert self.minifier.minify_string(input_str) == expected
 
 	def test_readme_example_minification(self):
 		"""Test the README example minification."""
@@ -192,6 +196,15 @@ func: method"""
 		assert "# Delimiters:" in result
 		assert "m:test" in result
 
+	def test_repeated_minification_respects_legend_setting(self):
+		"""Test memoized results still follow changes to include_legend."""
+		minifier = CodeStructMinifier(include_legend=False)
+		content = "module: test"
+		assert minifier.minify_string(content) == "m:test"
+
+		minifier.include_legend = True
+		assert minifier.minify_string(content) == self.minifier_with_legend.minify_string(content)
+
 	def test_empty_content(self):
 		"""Test empty content handling."""
 		result = self.minifier.minify_string("")
@@ -208,26 +221,32 @@ func: method"""
 		# Should just treat it as a regular entity
 		assert "invalid:syntax $$$ error" in result
 
-	def test_file_operations(self, tmp_path):
-		"""Test file reading and writing operations."""
-		# Create a test file
+	def test_minify_file(self, tmp_path):
+		"""Test minifying content read from a file."""
 		test_file = tmp_path / "test.cst"
-		content = """module: test
-  func: method [type: STRING]"""
-		test_file.write_text(content)
+		test_file.write_text("""module: test
+  func: method [type: STRING]""")
 
-		# Test minify_file
 		result = self.minifier.minify_file(str(test_file))
-		expected = "m:test|fn:method[t:STR]"
-		assert result == expected
+		assert result == "m:test|fn:method[t:STR]"
 
-		# Test save_minified_file
-		output_file = self.minifier.save_minified_file(str(test_file))
-		assert output_file == str(test_file.with_suffix(".min.cst"))
+	@pytest.mark.parametrize("newline", ["\r", "\r\n"], ids=["cr", "crlf"])
+	def test_minify_file_normalizes_line_endings(self, tmp_path, newline):
+		"""Test minifying files with CR-only and CRLF line endings."""
+		test_file = tmp_path / "test.cst"
+		test_file.write_bytes(newline.join(["module: a", "  func: b", "    type: STR", "  func: c", ""]).encode())
+
+		assert self.minifier.minify_file(str(test_file)) == "m:a|fn:b[t:STR],fn:c"
 
-		minified_content = tmp_path / "test.min.cst"
-		assert minified_content.exists()
-		assert minified_content.read_text().strip() == expected
+	def test_save_minified_file_suffix(self, tmp_path):
+		"""Test that the minified output is written next to the input with a .min.cst suffix."""
+		test_file = tmp_path / "test.cst"
+		test_file.write_text("module: test")
+		with patch.object(Path, "write_text", autospec=True) as write_text:
+			output_file = self.minifier.save_minified_file(str(test_file))
+
+		assert output_file == str(test_file.with_suffix(".min.cst"))
+		write_text.assert_called_once_with(test_file.with_suffix(".min.cst"), "m:test", encoding="utf-8")
 
 	def test_file_not_found(self):
 		"""Test file not found error."""
@@ -241,6 +260,13 @@ func: method"""
 		expected = "fn:test[t:STR,d:hello,s:ext]"
 		assert result == expected
 
+	def test_unquoted_nested_brackets(self):
+		"""Test unquoted attribute values containing nested brackets."""
+		content = "param: items [type: List[int], default: none]"
+		result = self.minifier.minify_string(content)
+		expected = "p:items[t:List[int],d:none]"
+		assert result == expected
+
 	def test_quoted_attribute_values(self):
 		"""Test quoted attribute values."""
 		content = 'param: data [type: "List[Dict[str, Any]]"]'
@@ -5,6 +5,7 @@ from lark import Tree
 from lark.exceptions import ParseError
 
 from codestruct.parser import CodeStructParser
+from codestruct.transformer import flatten_structure
 
 from .conftest import BASE_TEST_PATH, VALID_CSTXT_FILES
 
@@ -14,10 +15,11 @@ def test_parser_instantiation(parser):
 	assert isinstance(parser, CodeStructParser)
 
 
-def test_parse_string_valid(parser, valid_cstxt_content, request):
-	if "simple.cstxt" in request.node.name:
-		pass
+def test_parser_instances_share_compiled_parser():
+	assert CodeStructParser().parser is CodeStructParser().parser
 
+
+def test_parse_string_valid(parser, valid_cstxt_content):
 	tree = parser.parse_string(valid_cstxt_content)
 	assert isinstance(tree, Tree)
 
@@ -33,6 +35,16 @@ def test_parse_string_only_comments_and_newlines(parser):
 	assert isinstance(tree, Tree)
 
 
+def test_parse_string_trailing_whitespace(parser):
+	content = "module: MyModule  \n  class: MyClass\t\n  \n  func: my_func "
+	cleaned = "module: MyModule\n  class: MyClass\n\n  func: my_func\n"
+	# Trailing spaces and tabs are dropped and the missing final newline is added before Lark sees the text
+	assert parser.parse_string(content) == parser.parser.parse(cleaned)
+
+	names = [node["name"] for node in flatten_structure(parser.transform_string(content)).nodes]
+	assert names == ["MyModule", "MyClass", "my_func"]
+
+
 def test_parse_string_invalid_syntax(parser):
 	invalid_content = "module: MyModule\n  class Oops No Colon"
 	with pytest.raises(ParseError) as excinfo:
@@ -42,9 +54,18 @@ def test_parse_string_invalid_syntax(parser):
 	assert "Unexpected token" in str(excinfo.value)
 
 
+@pytest.mark.parametrize(
+	"content",
+	["module: \n", "module: \t# comment\n", "module: \r\n\n\t# comment", "module:  [a: 1]\n"],
+	ids=["newline", "comment", "crlf_comment", "attributes"],
+)
+def test_parse_string_rejects_empty_entity_name(parser, content):
+	with pytest.raises(ParseError):
+		parser.parse_string(content)
+
+
 @pytest.mark.parametrize("file_path", VALID_CSTXT_FILES, ids=[p.name for p in VALID_CSTXT_FILES])
 def test_parse_file_valid(parser, file_path):
-	assert file_path.exists(), f"Test file {file_path} not found."
 	tree = parser.parse_file(file_path)
 	assert isinstance(tree, Tree)
 
@@ -57,9 +78,7 @@ def test_parse_file_not_found(parser):
 	assert str(non_existent_file) in str(excinfo.value)
 
 
-def test_parse_file_invalid_content(parser, tmp_path):
-	invalid_content_file = tmp_path / "invalid.cstxt"
-	invalid_content_file.write_text("module Bad Module Syntax :::\n  func missing_colon")
+def test_parse_file_invalid_content(parser, invalid_cst_file):
 	with pytest.raises(ParseError) as excinfo:
-		parser.parse_file(invalid_content_file)
+		parser.parse_file(invalid_cst_file)
 	assert "Error parsing CodeStruct" in str(excinfo.value)
@@ -1,128 +1,152 @@
 """Test the transformer module."""
 
+import re
+
 import pytest
-from lark import logger
 
-from .conftest import SIMPLE_CSTXT_PATH, VALID_CSTXT_CONTENTS_AND_NAMES
+from .conftest import SIMPLE_CSTXT_PATH, VALID_CSTXT_FILES
+
+# Matches content made only of blank lines and comment lines
+COMMENTS_OR_BLANK_RE = re.compile(r"\A\s*(?:#[^\r\n]*(?:[\r\n]\s*|\Z))*\Z")
 
 # --- Tests for the transformer ---
 
 
-@pytest.mark.parametrize(
-	("content", "name"), VALID_CSTXT_CONTENTS_AND_NAMES, ids=[name for _, name in VALID_CSTXT_CONTENTS_AND_NAMES]
-)
-def test_transform_valid_tree_produces_list(parser, transformer, content, name):
-	tree = parser.parse_string(content)
-	transformed_data = transformer.transform(tree)
+@pytest.mark.parametrize("cst_case", VALID_CSTXT_FILES, indirect=True, ids=[p.name for p in VALID_CSTXT_FILES])
+def test_transform_valid_tree_produces_list(cst_case):
+	content, name, transformed_data = cst_case.text, cst_case.path.name, cst_case.transformed
 	assert isinstance(transformed_data, list)
 	# Check if content is not just whitespace or comments
-	if content.strip() and not all(line.strip().startswith("#") or not line.strip() for line in content.splitlines()):
+	if content.strip() and not COMMENTS_OR_BLANK_RE.match(content):
 		assert len(transformed_data) > 0, f"Transformed data for {name} should not be empty for non-empty content"
-		for item in transformed_data:
-			assert isinstance(item, dict), f"Each item in transformed data for {name} should be a dict"
+		assert all(type(item) is dict for item in transformed_data), (
+			f"Each item in transformed data for {name} should be a dict"
+		)
 	elif not content.strip():  # Truly empty content
 		assert len(transformed_data) == 0, f"Transformed data for empty content {name} should be empty"
 
 
-def test_transform_simple_structure(parser, transformer):
+@pytest.mark.parametrize("cst_case", VALID_CSTXT_FILES, indirect=True, ids=[p.name for p in VALID_CSTXT_FILES])
+def test_transform_string_matches_tree_transform(parser, cst_case):
+	assert parser.transform_string(cst_case.text) == cst_case.transformed
+
+
+@pytest.mark.parametrize("cst_case", [SIMPLE_CSTXT_PATH], indirect=True, ids=[SIMPLE_CSTXT_PATH.name])
+def test_transform_flat_matches_nested_structure(transformer, cst_case):
+	nested = cst_case.transformed
+	nodes, parents = transformer.transform_flat(cst_case.tree)
+
+	assert len(nodes) == len(parents)
+	assert [node for node, parent in zip(nodes, parents, strict=True) if parent == -1] == nested
+	for index, parent in enumerate(parents):
+		if parent != -1:
+			assert parent < index
+			assert any(child is nodes[index] for child in nodes[parent]["children"])
+
+
+# Expected transform of the first two top-level items of simple.cst
+EXPECTED_SIMPLE_HEAD = [
+	{"comment": "Simple CodeStruct Test File"},
+	{
+		"type": "module",
+		"name": "TestModule",
+		"children": [
+			{"comment": "Module comment"},
+			{
+				"type": "class",
+				"name": "SimpleClass",
+				"children": [
+					{"doc": "A simple class for testing"},
+					{
+						"type": "func",
+						"name": "test_method",
+						"children": [
+							{"doc": "A test method"},
+							{
+								"impl": {
+									"language": "python",
+									"code": 'def test_method():\n            return "Hello, world!"',
+								}
+							},
+						],
+					},
+				],
+			},
+		],
+	},
+]
+
+# Expected header (everything but children) of TestClass in simple.cst
+EXPECTED_TEST_CLASS_HEADER = {
+	"type": "class",
+	"name": "TestClass",
+	"attributes": {"visibility": "public", "abstract": "true"},
+	"grouped": ["BaseClass", "ITestable"],
+}
+
+
+@pytest.mark.parametrize("cst_case", [SIMPLE_CSTXT_PATH], indirect=True, ids=[SIMPLE_CSTXT_PATH.name])
+def test_transform_simple_structure(cst_case):
 	# Using simple.cstxt content directly for clarity in this specific test
-	content = SIMPLE_CSTXT_PATH.read_text()
-	tree = parser.parse_string(content)
-	logger.debug(tree)
-	result = transformer.transform(tree)
-	logger.debug(result)
-
-	assert result[0] == {"comment": "Simple CodeStruct Test File"}
-
-	test_module = result[1]
-	assert test_module["type"] == "module"
-	assert test_module["name"] == "TestModule"
-	assert "children" in test_module
-
-	module_children = test_module["children"]
-	assert module_children[0] == {"comment": "Module comment"}
-
-	simple_class = module_children[1]
-	assert simple_class["type"] == "class"
-	assert simple_class["name"] == "SimpleClass"
-	assert "attributes" not in simple_class  # No [...] attributes
-
-	assert "children" in simple_class
-	simple_class_children = simple_class["children"]
-
-	assert simple_class_children[0] == {"doc": "A simple class for testing"}
-
-	test_method_entity = simple_class_children[1]
-	assert test_method_entity["type"] == "func"
-	assert test_method_entity["name"] == "test_method"
-
-	assert "children" in test_method_entity
-	test_method_children = test_method_entity["children"]
-	assert test_method_children[0] == {"doc": "A test method"}
-
-	impl_field = test_method_children[1]
-	assert "impl" in impl_field
-	assert impl_field["impl"]["language"] == "python"
-	assert "def test_method():" in impl_field["impl"]["code"]
-
-	my_test_module = result[2]
-	test_class = my_test_module["children"][1]
-	assert test_class["type"] == "class"
-	assert test_class["name"] == "TestClass"
-	assert test_class.get("attributes", {}) == {"visibility": "public", "abstract": "true"}
-	assert test_class.get("grouped") == ["BaseClass", "ITestable"]
-
-
-def test_transform_attributes(parser, transformer):
-	content = """class: MyClass [attr1:value1, attr2:"a string", attr3:123, attr4:true, attr5:false, attr6:null, attr7:1.23]"""
-	tree = parser.parse_string(content)
-	result = transformer.transform(tree)
-
-	my_class = result[0]
-	assert my_class.get("attributes", {}) == {
-		"attr1": "value1",
-		"attr2": "a string",
-		"attr3": 123,
-		"attr4": "true",
-		"attr5": "false",
-		"attr6": "null",
-		"attr7": 1.23,
-	}
-
-
-def test_transform_hash_id(parser, transformer):
-	content = "module: MyModule ::: myhash123"
-	tree = parser.parse_string(content)
-	result = transformer.transform(tree)
-	assert result[0]["hash"] == "myhash123"
-
-
-def test_transform_grouped_entities(parser, transformer):
-	content = "class: MyClass &Group1 &Group2"
-	tree = parser.parse_string(content)
-	result = transformer.transform(tree)
-	assert result[0]["grouped"] == ["Group1", "Group2"]
-
-
-def test_transform_empty_impl_block(parser, transformer):
-	content = "func: myFunc\n  impl:\n    ```\n    ```"
-	tree = parser.parse_string(content)
-	result = transformer.transform(tree)
-	my_func = result[0]
-	assert "children" in my_func
-	impl_field = my_func["children"][0]  # impl is a child field
-	assert "impl" in impl_field
-	assert impl_field["impl"]["code"] == ""
-	assert "language" not in impl_field["impl"]
-
-
-def test_transform_impl_block_with_lang(parser, transformer):
-	content = "func: myFunc\n  impl:\n    ```python\nprint('hello')\n    ```"
-	tree = parser.parse_string(content)
-	result = transformer.transform(tree)
-	my_func = result[0]
-	assert "children" in my_func
-	impl_field = my_func["children"][0]  # impl is a child field
-	assert "impl" in impl_field
-	assert impl_field["impl"]["language"] == "python"
-	assert impl_field["impl"]["code"] == "print('hello')"
+	result = cst_case.transformed
+
+	assert result[:2] == EXPECTED_SIMPLE_HEAD
+
+	test_class = result[2]["children"][1]
+	assert {key: value for key, value in test_class.items() if key != "children"} == EXPECTED_TEST_CLASS_HEADER
+
+
+# One-entity snippets and the structure each must transform into
+SINGLE_ENTITY_CASES = {
+	"attributes": (
+		"""class: MyClass [attr1:value1, attr2:"a string", attr3:123, attr4:true, attr5:false, attr6:null, attr7:1.23]""",
+		{
+			"type": "class",
+			"name": "MyClass",
+			"attributes": {
+				"attr1": "value1",
+				"attr2": "a string",
+				"attr3": 123,
+				"attr4": "true",
+				"attr5": "false",
+				"attr6": "null",
+				"attr7": 1.23,
+			},
+		},
+	),
+	"hash_id": (
+		"module: MyModule ::: myhash123",
+		{"type": "module", "name": "MyModule", "hash": "myhash123"},
+	),
+	# CRLF line endings and trailing non-breaking spaces are not part of names or docstrings
+	"crlf_docstring": (
+		"module: m\r\n  doc: hello\xa0\r\n",
+		{"type": "module", "name": "m", "children": [{"doc": "hello"}]},
+	),
+	"grouped_entities": (
+		"class: MyClass &Group1 &Group2",
+		{"type": "class", "name": "MyClass", "grouped": ["Group1", "Group2"]},
+	),
+	# An impl block without a language tag has no "language" key
+	"empty_impl_block": (
+		"func: myFunc\n  impl:\n    ```\n    ```",
+		{"type": "func", "name": "myFunc", "children": [{"impl": {"code": ""}}]},
+	),
+	"impl_block_with_lang": (
+		"func: myFunc\n  impl:\n    ```python\nprint('hello')\n    ```",
+		{"type": "func", "name": "myFunc", "children": [{"impl": {"language": "python", "code": "print('hello')"}}]},
+	),
+}
+
+
+@pytest.mark.parametrize(("content", "expected"), SINGLE_ENTITY_CASES.values(), ids=SINGLE_ENTITY_CASES.keys())
+def test_transform_single_entity(parse_cached, transformer, content, expected):
+	assert transformer.transform(parse_cached(content)) == [expected]
+
+
+def test_transform_repeated_attributes_keep_value_types(parse_cached, transformer):
+	contents = ["func: a [size:1]", "func: b [size:1.0]", "func: c [size:1]"]
+
+	sizes = [transformer.transform(parse_cached(content))[0]["attributes"]["size"] for content in contents]
+	assert sizes == [1, 1.0, 1]
+	assert [type(size) for size in sizes] == [int, float, int]